@@ -15,8 +15,10 @@
 # imports from python standard library
 import grading
 import imp
+import multiprocessing
 import optparse
 import os
+import pickle
 import re
 import sys
 import projectParams
@@ -79,6 +81,11 @@ def readCommand(argv):
                     dest = 'noGraphics',
                     action = 'store_true',
                     help = 'No graphics display for pacman games.')
+    parser.add_option('--jobs', '-j',
+                    dest = 'jobs',
+                    type = 'int',
+                    default = 1,
+                    help = 'Run test cases in this many processes, each test case starting from random.seed(0).')
     (options, args) = parser.parse_args(argv)
     return options
 
@@ -243,10 +250,76 @@ def getTestSubdirs(testParser, testRoot, questionToGrade):
     return sorted(os.listdir(testRoot))
 
 
+# test cases run by the worker processes of evaluate(jobs=N), as
+# (testCase, moduleDict, testDict, solutionDict, printTestCase); the workers
+# are forked after it is filled and get jobs by index
+PARALLEL_JOBS = []
+PARALLEL_RESULTS = {}
+
+def executeTestCase(testCase, grades, moduleDict, testDict, solutionDict, printTestCase=False):
+    "Runs a test case, printing it first if printTestCase"
+    if printTestCase:
+        printTest(testDict, solutionDict)
+    return testCase.execute(grades, moduleDict, solutionDict)
+
+def runParallelJob(index):
+    "Runs a test case in a worker, recording its grades calls and output"
+    testCase, moduleDict, testDict, solutionDict, printTestCase = PARALLEL_JOBS[index]
+    # which test cases a worker ran before this one varies from run to run,
+    # so reseed to make the random numbers of each test case repeatable
+    random.seed(0)
+    recorder = grading.GradesRecorder()
+    stdout = sys.stdout
+    sys.stdout = recorder
+    result, error = None, None
+    try:
+        result = executeTestCase(testCase, recorder, moduleDict, testDict, solutionDict, printTestCase)
+    except BaseException as inst:
+        error = inst
+    finally:
+        sys.stdout = stdout
+    try:
+        pickle.dumps(error)
+    except Exception:
+        error = Exception(str(error))
+    return result, recorder.calls, error
+
+def replayParallelJob(index, grades):
+    "Waits for a test case run by runParallelJob and applies its results to grades"
+    result, calls, error = PARALLEL_RESULTS[index].get()
+    grading.replayGrades(grades, calls)
+    if error is not None:
+        raise error
+    return result
+
+def startParallelJobs(jobs, questionJobs, questionDicts, questions):
+    """
+    Forks jobs workers and queues the test cases of questionJobs on them,
+    question by question with the prerequisites ('depends') of a question
+    queued before it, so they are graded first.  Questions whose
+    prerequisites then fail are skipped by Grades, and their results unused.
+    """
+    visited, queued = set(), []
+    def queue(q):
+        if q in visited or q not in questionJobs:
+            return
+        visited.add(q)
+        for prereq in questionDicts[q].get('depends', '').split():
+            queue(prereq)
+        queued.append(q)
+    for q in questions:
+        queue(q)
+    pool = multiprocessing.get_context('fork').Pool(jobs)
+    for q in queued:
+        for index in questionJobs[q]:
+            PARALLEL_RESULTS[index] = pool.apply_async(runParallelJob, (index,))
+    pool.close()
+    return pool
+
 # evaluate student code
 def evaluate(generateSolutions, testRoot, moduleDict, exceptionMap=ERROR_HINT_MAP,
              edxOutput=False, muteOutput=False, gsOutput=False,
-            printTestCase=False, questionToGrade=None, display=None):
+            printTestCase=False, questionToGrade=None, display=None, jobs=1):
     # imports of testbench code.  note that the testClasses import must follow
     # the import of student code due to dependencies
     import testParser
@@ -256,6 +329,8 @@ def evaluate(generateSolutions, testRoot, moduleDict, exceptionMap=ERROR_HINT_MA
 
     questions = []
     questionDicts = {}
+    questionJobs = {}
+    parallel = jobs > 1 and not generateSolutions and 'fork' in multiprocessing.get_all_start_methods()
     test_subdirs = getTestSubdirs(testParser, testRoot, questionToGrade)
     for q in test_subdirs:
         subdir_path = os.path.join(testRoot, q)
@@ -267,6 +342,7 @@ def evaluate(generateSolutions, testRoot, moduleDict, exceptionMap=ERROR_HINT_MA
         questionClass = getattr(testClasses, questionDict['class'])
         question = questionClass(questionDict, display)
         questionDicts[q] = questionDict
+        questionJobs[q] = []
 
         # load test cases into question
         tests = filter(lambda t: re.match('[^#~.].*\.test\Z', t), os.listdir(subdir_path))
@@ -289,10 +365,12 @@ def evaluate(generateSolutions, testRoot, moduleDict, exceptionMap=ERROR_HINT_MA
                     # read in solution dictionary and pass as an argument
                     testDict = testParser.TestParser(test_file).parse()
                     solutionDict = testParser.TestParser(solution_file).parse()
-                    if printTestCase:
-                        return lambda grades: printTest(testDict, solutionDict) or testCase.execute(grades, moduleDict, solutionDict)
-                    else:
-                        return lambda grades: testCase.execute(grades, moduleDict, solutionDict)
+                    if parallel:
+                        index = len(PARALLEL_JOBS)
+                        PARALLEL_JOBS.append((testCase, moduleDict, testDict, solutionDict, printTestCase))
+                        questionJobs[q].append(index)
+                        return lambda grades: replayParallelJob(index, grades)
+                    return lambda grades: executeTestCase(testCase, grades, moduleDict, testDict, solutionDict, printTestCase)
             question.addTestCase(testCase, makefun(testCase, solution_file))
 
         # Note extra function is necessary for scoping reasons
@@ -317,7 +395,16 @@ def evaluate(generateSolutions, testRoot, moduleDict, exceptionMap=ERROR_HINT_MA
             for prereq in questionDicts[q].get('depends', '').split():
                 grades.addPrereq(q, prereq)
 
-    grades.grade(sys.modules[__name__], bonusPic = projectParams.BONUS_PIC)
+    pool = None
+    if parallel:
+        pool = startParallelJobs(jobs, questionJobs, questionDicts, [q for q, _ in questions])
+    try:
+        grades.grade(sys.modules[__name__], bonusPic = projectParams.BONUS_PIC)
+    finally:
+        if pool is not None:
+            # drop the test cases of questions skipped for failed prerequisites
+            pool.terminate()
+            pool.join()
     return grades.points
 
 
@@ -364,4 +451,5 @@ if __name__ == '__main__':
         evaluate(options.generateSolutions, options.testRoot, moduleDict,
             gsOutput=options.gsOutput,
             edxOutput=options.edxOutput, muteOutput=options.muteOutput, printTestCase=options.printTestCase,
-            questionToGrade=options.gradeQuestion, display=getDisplay(options.gradeQuestion!=None, options))
+            questionToGrade=options.gradeQuestion, display=getDisplay(options.gradeQuestion!=None, options),
+            jobs=options.jobs)
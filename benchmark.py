@@ -0,0 +1,243 @@
+# benchmark.py
+# ------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Runs the search algorithms of search.py over the bundled layouts and the
+test cases of test_cases_assignment1, and records wall time, expansions,
+peak memory and solution cost of every run (see search.runWithStatistics).
+
+  python benchmark.py --output results.json --csv results.csv
+  python benchmark.py --layouts tinyMaze,trickySearch --baseline results.json
+
+With --baseline, runs that fail, find costlier solutions, expand more
+nodes or take noticeably more time or memory than in the baseline are
+reported as regressions and the exit status is 1.
+"""
+
+import csv
+import glob
+import json
+import optparse
+import os
+import sys
+import tracemalloc
+
+import layout
+import pacman
+import search
+import searchAgents
+import testParser
+import util
+
+# (problem, algorithm, heuristic) run on every layout that suits the problem:
+# PositionSearchProblem on layouts with a single food, which is the goal,
+# FoodSearchProblem on layouts with more food and the capsule problems on
+# layouts with capsules
+SEARCHES = [
+    ('PositionSearchProblem', 'bfs', None),
+    ('PositionSearchProblem', 'ucs', None),
+    ('PositionSearchProblem', 'astar', 'manhattanHeuristic'),
+    ('PositionSearchProblem', 'bibfs', None),
+    ('PositionSearchProblem', 'biastar', 'manhattanHeuristic'),
+    ('PositionSearchProblem', 'jps', None),
+    ('PositionSearchProblem', 'ehc', 'manhattanHeuristic'),
+    ('FoodSearchProblem', 'astar', 'foodHeuristic'),
+    ('FoodSearchProblem', 'ara', 'foodHeuristic'),
+    ('CapsuleSearchProblem', 'astar', 'capsuleProblemHeuristic'),
+    ('CapsuleAvoidSearchProblem', 'astar', 'capsuleAvoidProblemHeuristic'),
+]
+
+TEST_DIRECTORY = 'test_cases_assignment1'
+
+# Fraction of the timeout anytime searches get before returning their best solution
+ANYTIME_BUDGET = 0.8
+
+# Columns of the CSV output, in order
+COLUMNS = ['source', 'layout', 'problem', 'algorithm', 'heuristic', 'status', 'cost', 'pathLength',
+           'expanded', 'wallTime', 'peakMemory'] + [field for field in search.SearchStatistics.FIELDS
+                                                   if field not in ('expanded', 'wallTime')]
+
+def suits(problemName, lay):
+    food = lay.food.count()
+    if problemName == 'PositionSearchProblem':
+        return food == 1
+    if problemName == 'FoodSearchProblem':
+        return food > 1
+    return len(lay.capsules) > 0 and food > 0
+
+def makeProblem(problemName, lay):
+    gameState = pacman.GameState()
+    gameState.initialize(lay, 0)
+    problemClass = getattr(searchAgents, problemName)
+    if problemClass is searchAgents.PositionSearchProblem:
+        return problemClass(gameState, goal=lay.food.asList()[0], warn=False, visualize=False)
+    return problemClass(gameState)
+
+def getHeuristic(name):
+    if name is None:
+        return None
+    return getattr(searchAgents, name) if hasattr(searchAgents, name) else getattr(search, name)
+
+def collectRuns(layoutNames=None, algorithms=None, includeTests=True):
+    """
+    Returns (source, layout name, Layout, problem, algorithm, heuristic)
+    tuples: SEARCHES on each layout of layouts/, then the search each test of
+    TEST_DIRECTORY asks for.
+    """
+    runs = []
+    for filename in sorted(glob.glob(os.path.join('layouts', '*.lay'))):
+        name = os.path.basename(filename)[:-len('.lay')]
+        if layoutNames and name not in layoutNames:
+            continue
+        lay = layout.getLayout(name)
+        for problemName, algorithm, heuristic in SEARCHES:
+            if (not algorithms or algorithm in algorithms) and suits(problemName, lay):
+                runs.append(('layouts', name, lay, problemName, algorithm, heuristic))
+    if includeTests:
+        for filename in sorted(glob.glob(os.path.join(TEST_DIRECTORY, '*', '*.test'))):
+            test = testParser.TestParser(filename).parse()
+            if 'layout' not in test or 'algorithm' not in test:
+                continue
+            name = test.get('layoutName', os.path.basename(filename))
+            if layoutNames and name not in layoutNames:
+                continue
+            algorithm = test['algorithm']
+            if algorithms and algorithm not in algorithms:
+                continue
+            lay = layout.internLayout([l.strip() for l in test['layout'].split('\n')])
+            runs.append((filename, name, lay, test.get('searchProblemClass', 'PositionSearchProblem'),
+                         algorithm, test.get('heuristic', None)))
+    return runs
+
+def runOne(source, name, lay, problemName, algorithm, heuristicName, timeout, measureMemory):
+    "Runs one search and returns its record"
+    record = {'source': source, 'layout': name, 'problem': problemName,
+              'algorithm': algorithm, 'heuristic': heuristicName}
+    problem = makeProblem(problemName, lay)
+    searchFunction = getattr(search, algorithm)
+    options = {}
+    if searchFunction is search.anytimeRepairingAStarSearch:
+        # report the best solution found in time rather than a timeout
+        options['timeLimit'] = timeout * ANYTIME_BUDGET
+    if measureMemory:
+        tracemalloc.start()
+    try:
+        util.mutePrint()
+        try:
+            run = util.TimeoutFunction(search.runWithStatistics, timeout)
+            actions, statistics = run(searchFunction, problem, getHeuristic(heuristicName), **options)
+        finally:
+            util.unmutePrint()
+        record.update(statistics)
+        record['algorithm'] = algorithm
+        record['status'] = 'ok' if actions is not None else 'nopath'
+    except util.TimeoutFunctionException:
+        record['status'] = 'timeout'
+    except (Exception, SystemExit) as e:
+        record['status'] = 'error: %s' % type(e).__name__
+    finally:
+        if measureMemory:
+            record['peakMemory'] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    # problems count their own expansions, also for searches that bypass getSuccessors
+    if hasattr(problem, '_expanded') and record['status'] == 'ok':
+        record['expanded'] = problem._expanded
+    return record
+
+def runKey(record):
+    return (record['source'], record['layout'], record['problem'], record['algorithm'], record['heuristic'])
+
+def compareToBaseline(records, baseline, tolerance):
+    """
+    Returns a message for each record that regressed from the baseline run
+    with the same key.  Times and memory only count as regressions when they
+    grow by more than the tolerance fraction and by a noticeable amount.
+    """
+    previous = dict((runKey(record), record) for record in baseline)
+    messages = []
+    for record in records:
+        old = previous.get(runKey(record))
+        if old is None or old['status'] != 'ok':
+            continue
+        label = '%s %s %s/%s(%s)' % runKey(record)
+        if record['status'] != 'ok':
+            messages.append('%s: %s, was ok' % (label, record['status']))
+            continue
+        if record['cost'] > old['cost']:
+            messages.append('%s: cost %s, was %s' % (label, record['cost'], old['cost']))
+        if record['expanded'] > old['expanded']:
+            messages.append('%s: expanded %d, was %d' % (label, record['expanded'], old['expanded']))
+        if record['wallTime'] > old['wallTime'] * (1 + tolerance) and record['wallTime'] - old['wallTime'] > 0.05:
+            messages.append('%s: %.3fs, was %.3fs' % (label, record['wallTime'], old['wallTime']))
+        if (record.get('peakMemory') and old.get('peakMemory') and
+            record['peakMemory'] > old['peakMemory'] * (1 + tolerance) and
+            record['peakMemory'] - old['peakMemory'] > 1 << 20):
+            messages.append('%s: peak memory %d, was %d' % (label, record['peakMemory'], old['peakMemory']))
+    return messages
+
+def writeCsv(records, filename):
+    with open(filename, 'w') as handle:
+        writer = csv.DictWriter(handle, COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+        for record in records:
+            writer.writerow(record)
+
+def readCommand(argv):
+    parser = optparse.OptionParser(description='Benchmark the search algorithms on the bundled layouts')
+    parser.add_option('--layouts', dest='layouts', default='',
+                      help='comma separated layout names to run (default: all)')
+    parser.add_option('--algorithms', dest='algorithms', default='',
+                      help='comma separated search.py function names to run (default: all)')
+    parser.add_option('--no-tests', dest='tests', action='store_false', default=True,
+                      help='skip the layouts of %s' % TEST_DIRECTORY)
+    parser.add_option('--timeout', dest='timeout', type='int', default=10,
+                      help='seconds allowed per run [Default: %default]')
+    parser.add_option('--no-memory', dest='memory', action='store_false', default=True,
+                      help='do not trace peak memory, which slows the runs down')
+    parser.add_option('--output', dest='output', default=None, help='write the records as JSON')
+    parser.add_option('--csv', dest='csv', default=None, help='write the records as CSV')
+    parser.add_option('--baseline', dest='baseline', default=None,
+                      help='JSON records of an earlier run to compare with')
+    parser.add_option('--tolerance', dest='tolerance', type='float', default=0.25,
+                      help='relative time and memory growth tolerated against the baseline [Default: %default]')
+    options, otherjunk = parser.parse_args(argv)
+    if len(otherjunk) != 0:
+        raise Exception('Command line input not understood: ' + str(otherjunk))
+    return options
+
+if __name__ == '__main__':
+    options = readCommand(sys.argv[1:])
+    runs = collectRuns([name for name in options.layouts.split(',') if name],
+                       [name for name in options.algorithms.split(',') if name], options.tests)
+    records = []
+    for run in runs:
+        record = runOne(*(run + (options.timeout, options.memory)))
+        records.append(record)
+        print('%-45s %-26s %-8s %-30s %-8s cost=%-6s expanded=%-8s %.3fs' % (
+            record['source'] + ':' + record['layout'], record['problem'], record['algorithm'],
+            record['heuristic'] or '', record['status'], record.get('cost'), record.get('expanded'),
+            record.get('wallTime', 0)))
+    if options.output:
+        with open(options.output, 'w') as handle:
+            json.dump(records, handle, indent=1, sort_keys=True)
+    if options.csv:
+        writeCsv(records, options.csv)
+    if options.baseline:
+        with open(options.baseline) as handle:
+            messages = compareToBaseline(records, json.load(handle), options.tolerance)
+        for message in messages:
+            print('REGRESSION ' + message)
+        print('%d regressions against %s' % (len(messages), options.baseline))
+        if messages:
+            sys.exit(1)
@@ -159,6 +159,16 @@ class AgentState:
     def getDirection(self):
         return self.configuration.getDirection()
 
+class FrozenColumn(list):
+    "A column of a frozen Grid, which raises on assignment"
+    def _frozen(self, *args):
+        raise TypeError('Frozen grids cannot be changed: copy them first')
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _frozen
+    append = extend = insert = pop = remove = reverse = sort = clear = _frozen
+
+    def __reduce__(self):
+        return (FrozenColumn, (list(self),))
+
 class Grid:
     """
     A 2-dimensional array of objects backed by a list of lists.  Data is accessed
@@ -190,6 +200,7 @@ class Grid:
 
     def __eq__(self, other):
         if other == None: return False
+        if isinstance(other, BitGrid): return other == self
         return self.data == other.data
 
     def __hash__(self):
@@ -203,18 +214,43 @@ class Grid:
                 base *= 2
         return hash(h)
 
-    def copy(self):
-        g = Grid(self.width, self.height)
-        g.data = [x[:] for x in self.data]
+    def _withData(self, data):
+        # copies without building a fresh grid of cells first
+        g = Grid.__new__(Grid)
+        g.__dict__.update(self.__dict__)
+        g.data = data
         return g
 
+    def copy(self):
+        return self._withData([x[:] for x in self.data])
+
     def deepCopy(self):
         return self.copy()
 
     def shallowCopy(self):
-        g = Grid(self.width, self.height)
-        g.data = self.data
-        return g
+        return self._withData(self.data)
+
+    def freeze(self):
+        "Returns a copy that cannot be changed in place; its copies can"
+        return self._withData(FrozenColumn([FrozenColumn(x) for x in self.data]))
+
+    def isFrozen(self):
+        return isinstance(self.data, FrozenColumn)
+
+    def copyWith(self, x, y, item):
+        """
+        Returns a copy with cell (x, y) set to item, sharing all other columns
+        with this grid, so it takes time linear in width plus height.  Neither
+        grid may then be changed in place; the copy of a frozen grid is frozen.
+        """
+        column = self.data[x][:]
+        column[y] = item
+        data = self.data[:]
+        if self.isFrozen():
+            data[x] = FrozenColumn(column)
+            return self._withData(FrozenColumn(data))
+        data[x] = column
+        return self._withData(data)
 
     def count(self, item =True ):
         return sum([x.count(item) for x in self.data])
@@ -280,6 +316,126 @@ def reconstituteGrid(bitRep):
     width, height = bitRep[:2]
     return Grid(width, height, bitRepresentation= bitRep[2:])
 
+class BitGrid:
+    """
+    An immutable 2-dimensional boolean grid backed by a single Python int.
+
+    Cell (x,y) is stored in bit x * height + y, so reading keeps the grid[x][y]
+    convention of Grid while copying is free, hashing is cached and count() is
+    a popcount.  Use without(x, y) to get a new grid with a cell cleared.
+
+    BitGrids are meant for search states (food and capsules) that are copied
+    and hashed once per generated node; use Grid when the cells must be edited
+    in place.
+    """
+    __slots__ = ('width', 'height', 'bits', '_hash')
+
+    def __init__(self, width, height, bits=0):
+        self.width = width
+        self.height = height
+        self.bits = bits
+        self._hash = None
+
+    def fromGrid(grid):
+        "Builds a BitGrid holding the same cells as a Grid (or BitGrid)."
+        if isinstance(grid, BitGrid):
+            return grid
+        bits = 0
+        height = grid.height
+        for x in range(grid.width):
+            column = grid[x]
+            for y in range(height):
+                if column[y]:
+                    bits |= 1 << (x * height + y)
+        return BitGrid(grid.width, height, bits)
+    fromGrid = staticmethod(fromGrid)
+
+    def __getitem__(self, x):
+        return _BitGridColumn(self.bits >> (x * self.height), self.height)
+
+    def __setitem__(self, key, item):
+        raise TypeError('BitGrid is immutable; use without(x, y) instead')
+
+    def __eq__(self, other):
+        # equal to a Grid with the same cells, whose hash is the same too
+        if isinstance(other, Grid): other = BitGrid.fromGrid(other)
+        if not isinstance(other, BitGrid): return False
+        return self.bits == other.bits and self.width == other.width and self.height == other.height
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash(self.bits)
+        return self._hash
+
+    def __str__(self):
+        out = [[str(self[x][y])[0] for x in range(self.width)] for y in range(self.height)]
+        out.reverse()
+        return '\n'.join([''.join(x) for x in out])
+
+    def without(self, x, y):
+        """
+        Returns a grid with cell (x,y) set to False.  The grid itself is
+        returned when the cell is already False.
+        """
+        mask = 1 << (x * self.height + y)
+        if not self.bits & mask:
+            return self
+        return BitGrid(self.width, self.height, self.bits & ~mask)
+
+    def copy(self):
+        return self
+
+    def deepCopy(self):
+        return self
+
+    def shallowCopy(self):
+        return self
+
+    def count(self, item=True):
+        n = bin(self.bits).count('1')
+        if item:
+            return n
+        return self.width * self.height - n
+
+    def asList(self, key=True):
+        if not key:
+            return self.toGrid().asList(False)
+        list = []
+        bits = self.bits
+        height = self.height
+        while bits:
+            low = bits & -bits
+            index = low.bit_length() - 1
+            list.append((index // height, index % height))
+            bits ^= low
+        return list
+
+    def toGrid(self):
+        "Returns a mutable Grid copy of this grid."
+        g = Grid(self.width, self.height)
+        for x, y in self.asList():
+            g[x][y] = True
+        return g
+
+class _BitGridColumn:
+    "A read-only view of one column of a BitGrid, indexed by y."
+    __slots__ = ('bits', 'height')
+
+    def __init__(self, bits, height):
+        self.bits = bits
+        self.height = height
+
+    def __getitem__(self, y):
+        if y < 0 or y >= self.height:
+            raise IndexError('BitGrid column index out of range')
+        return (self.bits >> y) & 1 == 1
+
+    def __len__(self):
+        return self.height
+
 ####################################
 # Parts you shouldn't have to read #
 ####################################
@@ -378,6 +534,7 @@ class GameStateData:
         """
         if prevState != None:
             self.food = prevState.food.shallowCopy()
+            self.numFood = prevState.numFood
             self.capsules = prevState.capsules[:]
             self.agentStates = self.copyAgentStates( prevState.agentStates )
             self.layout = prevState.layout
@@ -393,9 +550,8 @@ class GameStateData:
         self.scoreChange = 0
 
     def deepCopy( self ):
+        # layouts are never changed and the food is frozen, so the copy shares both
         state = GameStateData( self )
-        state.food = self.food.deepCopy()
-        state.layout = self.layout.deepCopy()
         state._agentMoved = self._agentMoved
         state._foodEaten = self._foodEaten
         state._foodAdded = self._foodAdded
@@ -488,7 +644,9 @@ class GameStateData:
         """
         Creates an initial game state from a layout array (see layout.py).
         """
-        self.food = layout.food.copy()
+        # frozen, so that states and observations can share it (see Grid.copyWith)
+        self.food = layout.food if layout.food.isFrozen() else layout.food.freeze()
+        self.numFood = layout.totalFood
         #self.capsules = []
         self.capsules = layout.capsules[:]
         self.layout = layout
@@ -583,6 +741,8 @@ class Game:
                 self.unmute()
                 self._agentCrash(i, quiet=True)
                 return
+            if ("setMoveTimeout" in dir(agent)):
+                agent.setMoveTimeout(self.rules.getMoveTimeout(i))
             if ("registerInitialState" in dir(agent)):
                 self.mute(i)
                 if self.catchExceptions:
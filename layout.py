@@ -12,13 +12,39 @@
 # Pieter Abbeel (pabbeel@cs.berkeley.edu).
 
 
-from util import manhattanDistance
+from util import manhattanDistance, LRUCache
 from game import Grid
 import os
+import sys
 import random
+import heapq
+import hashlib
+import mmap
+import struct
+from array import array
 from functools import reduce
 
+try:
+    import numpy
+    _NUMPY_ENABLED = True
+except ImportError:
+    _NUMPY_ENABLED = False
+
 VISIBILITY_MATRIX_CACHE = {}
+MAZE_DISTANCES_CACHE = {}
+# the MazeDistances of recently used frozen wall grids, by the id of the grid
+MAZE_DISTANCES_BY_WALLS = LRUCache(64)
+# Layouts by text, and their walls, food and capsules by content: see internLayout
+LAYOUT_CACHE = {}
+BOARD_CACHE = {}
+
+# Sidecar files holding precomputed MazeDistances tables for a .lay file
+MAZE_DISTANCES_EXTENSION = '.dist'
+MAZE_DISTANCES_MAGIC = b'PACDIST\0'
+MAZE_DISTANCES_VERSION = 1
+# Capsule entry costs precomputed next to the unit-cost table: the costs of
+# encourageCapCostFn and avoidCapCostFn in searchAgents.py
+MAZE_DISTANCES_CAPSULE_COSTS = (0, 2)
 
 class Layout:
     """
@@ -36,6 +62,7 @@ class Layout:
         self.processLayoutText(layoutText)
         self.layoutText = layoutText
         self.totalFood = len(self.food.asList())
+        self.mazeDistancesFile = None
         # self.initializeVisibilityMatrix()
 
     def getNumGhosts(self):
@@ -91,7 +118,31 @@ class Layout:
         return "\n".join(self.layoutText)
 
     def deepCopy(self):
-        return Layout(self.layoutText[:])
+        # layouts are never modified, so copies can share them
+        return self
+
+    def loadMazeDistances(self, filename):
+        """
+        Memory-maps the distance tables of a sidecar file written by
+        saveMazeDistances so that getMazeDistances serves them without
+        recomputing.  Returns False if the file is missing, of another
+        version, written for other walls or truncated.
+        """
+        if loadMazeDistances(filename, self.walls) is None:
+            return False
+        self.mazeDistancesFile = filename
+        return True
+
+    def saveMazeDistances(self, filename, capsuleCosts=MAZE_DISTANCES_CAPSULE_COSTS):
+        """
+        Writes the unit-cost distance table of this layout, plus one table per
+        capsule entry cost in capsuleCosts, to a sidecar file.
+        """
+        cellCostsList = [None]
+        if self.capsules:
+            for cost in capsuleCosts:
+                cellCostsList.append(dict((capsule, cost) for capsule in self.capsules))
+        saveMazeDistances(filename, self.walls, cellCostsList)
 
     def processLayoutText(self, layoutText):
         """
@@ -129,6 +180,310 @@ class Layout:
         elif layoutChar in  ['1', '2', '3', '4']:
             self.agentPositions.append( (int(layoutChar), (x,y)))
             self.numGhosts += 1
+
+class MazeDistances:
+    """
+    Shortest maze distances between all pairs of open cells of a wall Grid.
+
+    Open cells are numbered once (x-major) and the distances are kept in a
+    flat array with one row of n entries per source cell.  A row is filled by
+    one BFS from its source the first time it is needed, so every later
+    distance(p, q) is a table lookup.
+
+    cellCosts optionally maps positions to the cost of stepping onto them
+    (every other open cell costs 1); rows are then filled with Dijkstra.
+    This gives the capsule-aware distances used by the capsule heuristics.
+    """
+
+    def __init__(self, walls, cellCosts=None, table=None):
+        self.width = walls.width
+        self.height = walls.height
+        self.cellCosts = dict(cellCosts or {})
+        self.index = {}
+        self.cells = []
+        for x in range(self.width):
+            for y in range(self.height):
+                if not walls[x][y]:
+                    self.index[(x, y)] = len(self.cells)
+                    self.cells.append((x, y))
+        n = len(self.cells)
+        self.numCells = n
+        self.neighbors = []
+        for x, y in self.cells:
+            self.neighbors.append([self.index[cell] for cell in ((x, y + 1), (x, y - 1), (x + 1, y), (x - 1, y))
+                                   if cell in self.index])
+        self.entryCosts = [self.cellCosts.get(cell, 1) for cell in self.cells]
+        self.unitCosts = all(cost == 1 for cost in self.entryCosts)
+        if table is not None:
+            # a complete table, e.g. a memoryview over a mapped sidecar file
+            self.typecode = table.format
+            self.unreachable = 0xFFFF if self.typecode == 'H' else 0xFFFFFFFF
+            self.table = table
+            self.filled = bytearray(b'\1') * n
+            return
+        maxCost = max(self.entryCosts + [1])
+        self.typecode = 'H' if maxCost * n < 0xFFFF else 'I'
+        self.unreachable = 0xFFFF if self.typecode == 'H' else 0xFFFFFFFF
+        self.table = array(self.typecode, [self.unreachable]) * (n * n)
+        self.filled = bytearray(n)
+
+    def distance(self, p, q):
+        """
+        Returns the cost of a shortest path from p to q, or float('inf') if q
+        cannot be reached.  Both positions must be open cells.
+        """
+        i = self.index[p]
+        if not self.filled[i]:
+            self._fillRow(i)
+        d = self.table[i * self.numCells + self.index[q]]
+        if d == self.unreachable:
+            return float('inf')
+        return d
+
+    def isComputed(self):
+        return all(self.filled)
+
+    def computeAll(self):
+        "Fills every row of the table and returns self"
+        for i in range(self.numCells):
+            if not self.filled[i]:
+                self._fillRow(i)
+        return self
+
+    def _fillRow(self, source):
+        table, neighbors, unreachable = self.table, self.neighbors, self.unreachable
+        base = source * self.numCells
+        table[base + source] = 0
+        if self.unitCosts:
+            frontier = [source]
+            d = 0
+            while frontier:
+                d += 1
+                nextFrontier = []
+                for cell in frontier:
+                    for neighbor in neighbors[cell]:
+                        if table[base + neighbor] == unreachable:
+                            table[base + neighbor] = d
+                            nextFrontier.append(neighbor)
+                frontier = nextFrontier
+        else:
+            entryCosts = self.entryCosts
+            heap = [(0, source)]
+            while heap:
+                d, cell = heapq.heappop(heap)
+                if d > table[base + cell]:
+                    continue
+                for neighbor in neighbors[cell]:
+                    nd = d + entryCosts[neighbor]
+                    if nd < table[base + neighbor]:
+                        table[base + neighbor] = nd
+                        heapq.heappush(heap, (nd, neighbor))
+        self.filled[source] = 1
+
+def getMazeDistances(walls, cellCosts=None):
+    """
+    Returns the MazeDistances for a wall Grid, shared by every caller that
+    asks for the same walls and cell costs.  The walls must not be changed
+    afterwards; those of layouts are frozen.
+    """
+    costsKey = tuple(sorted(cellCosts.items())) if cellCosts else ()
+    # frozen walls, such as those of layouts, are looked up by the object
+    # first, as str(walls) takes time in the size of the board; they cannot
+    # change, and the entry keeps them alive so their id stays unique
+    frozen = isinstance(walls, Grid) and walls.isFrozen()
+    byWalls = MAZE_DISTANCES_BY_WALLS.get(id(walls)) if frozen else None
+    if byWalls is None:
+        byWalls = (walls, {})
+        if frozen:
+            MAZE_DISTANCES_BY_WALLS[id(walls)] = byWalls
+    distances = byWalls[1].get(costsKey)
+    if distances is None:
+        key = (str(walls), costsKey)
+        if key not in MAZE_DISTANCES_CACHE:
+            MAZE_DISTANCES_CACHE[key] = MazeDistances(walls, cellCosts)
+        distances = byWalls[1][costsKey] = MAZE_DISTANCES_CACHE[key]
+    return distances
+
+# Value of cells that no source can reach in a distance field
+UNREACHABLE = -1
+
+def distanceField(walls, sources):
+    """
+    Returns a (width, height) NumPy array holding the maze distance from the
+    nearest of the source positions to every cell, or UNREACHABLE.  The BFS
+    advances the whole frontier at once by shifting it one cell in each
+    direction.
+    """
+    return distanceFields(walls, [sources])[0]
+
+def distanceFields(walls, sourcesList):
+    """
+    Returns a (len(sourcesList), width, height) NumPy array whose k-th slice
+    is distanceField(walls, sourcesList[k]).  Each entry of sourcesList is a
+    position or a list of positions; all fields are expanded together, e.g.
+    distanceFields(walls, food.asList()) for one field per food.
+    """
+    if not _NUMPY_ENABLED:
+        raise ImportError('distanceFields requires NumPy')
+    passable = ~numpy.array(walls.data, dtype=bool)
+    fields = numpy.full((len(sourcesList), walls.width, walls.height), UNREACHABLE, dtype=numpy.int32)
+    frontier = numpy.zeros(fields.shape, dtype=bool)
+    for k, sources in enumerate(sourcesList):
+        if isinstance(sources, tuple) and len(sources) == 2 and isinstance(sources[0], int):
+            sources = [sources]
+        for x, y in sources:
+            frontier[k, x, y] = True
+    frontier &= passable
+    reached = frontier.copy()
+    distance = 0
+    while frontier.any():
+        fields[frontier] = distance
+        step = numpy.zeros(frontier.shape, dtype=bool)
+        step[:, 1:, :] |= frontier[:, :-1, :]
+        step[:, :-1, :] |= frontier[:, 1:, :]
+        step[:, :, 1:] |= frontier[:, :, :-1]
+        step[:, :, :-1] |= frontier[:, :, 1:]
+        step &= passable
+        step &= ~reached
+        reached |= step
+        frontier = step
+        distance += 1
+    return fields
+
+def mazeDistancesFilename(layoutFilename):
+    "Returns the sidecar file name for a .lay file"
+    return os.path.splitext(layoutFilename)[0] + MAZE_DISTANCES_EXTENSION
+
+def _wallsDigest(walls):
+    return hashlib.sha1(str(walls).encode('ascii')).digest()
+
+# Sidecar layout, all integers little-endian:
+#   header: magic, version, width, height, number of cells, number of tables,
+#           sha1 of str(walls)
+#   per table: typecode, number of cells with their own cost, (x, y, cost)
+#              for each of them, then the n*n table padded to 4 bytes
+_HEADER = struct.Struct('<8sIIIII20s')
+_TABLE_HEADER = struct.Struct('<4sI')
+_COST_ENTRY = struct.Struct('<iii')
+
+def saveMazeDistances(filename, walls, cellCostsList=(None,)):
+    """
+    Computes one complete MazeDistances table per entry of cellCostsList and
+    writes them to a sidecar file that loadMazeDistances can map.
+    """
+    tables = [getMazeDistances(walls, cellCosts).computeAll() for cellCosts in cellCostsList]
+    chunks = [_HEADER.pack(MAZE_DISTANCES_MAGIC, MAZE_DISTANCES_VERSION, walls.width, walls.height,
+                           tables[0].numCells, len(tables), _wallsDigest(walls))]
+    for distances in tables:
+        costs = sorted(distances.cellCosts.items())
+        chunks.append(_TABLE_HEADER.pack(distances.typecode.encode('ascii'), len(costs)))
+        for (x, y), cost in costs:
+            if cost != int(cost):
+                raise ValueError('Only integer cell costs can be saved: %s' % cost)
+            chunks.append(_COST_ENTRY.pack(x, y, int(cost)))
+        data = array(distances.typecode, distances.table)
+        if sys.byteorder != 'little':
+            data.byteswap()
+        data = data.tobytes()
+        chunks.append(data + b'\0' * (-len(data) % 4))
+    # write to a temporary name first so readers never map a partial file
+    tmpname = '%s.%d.tmp' % (filename, os.getpid())
+    f = open(tmpname, 'wb')
+    try: f.write(b''.join(chunks))
+    finally: f.close()
+    os.replace(tmpname, filename)
+
+def _readTableHeaders(buffer, numCells, numTables):
+    """
+    Returns (typecode, cellCosts, offset, size) for each table of a sidecar,
+    or None if a header is invalid or a table runs past the end of the file.
+    """
+    tables = []
+    offset = _HEADER.size
+    for i in range(numTables):
+        if offset + _TABLE_HEADER.size > len(buffer):
+            return None
+        typecode, numCosts = _TABLE_HEADER.unpack_from(buffer, offset)
+        typecode = typecode.rstrip(b'\0').decode('ascii', 'replace')
+        offset += _TABLE_HEADER.size
+        if typecode not in ('H', 'I') or offset + numCosts * _COST_ENTRY.size > len(buffer):
+            return None
+        cellCosts = {}
+        for j in range(numCosts):
+            x, y, cost = _COST_ENTRY.unpack_from(buffer, offset)
+            cellCosts[(x, y)] = cost
+            offset += _COST_ENTRY.size
+        size = numCells * numCells * array(typecode).itemsize
+        if offset + size > len(buffer):
+            return None
+        tables.append((typecode, cellCosts, offset, size))
+        offset += size + (-size % 4)
+    return tables
+
+def loadMazeDistances(filename, walls):
+    """
+    Maps a sidecar file read-only and registers its tables with
+    getMazeDistances, so processes loading the same file share its pages.
+    Returns the list of loaded MazeDistances, or None if the file is missing,
+    has another version or byte order, does not match the walls or is
+    truncated.
+    """
+    if not os.path.exists(filename) or sys.byteorder != 'little':
+        return None
+    try:
+        f = open(filename, 'rb')
+        try:
+            if os.fstat(f.fileno()).st_size < _HEADER.size:
+                return None
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        finally: f.close()
+    except (OSError, ValueError):
+        return None
+    magic, version, width, height, numCells, numTables, digest = _HEADER.unpack_from(buffer, 0)
+    if (magic != MAZE_DISTANCES_MAGIC or version != MAZE_DISTANCES_VERSION or
+        (width, height) != (walls.width, walls.height) or digest != _wallsDigest(walls) or
+        numCells != sum(not wall for column in walls.data for wall in column)):
+        buffer.close()
+        return None
+    tables = _readTableHeaders(buffer, numCells, numTables)
+    if tables is None:
+        buffer.close()
+        return None
+    view = memoryview(buffer)
+    loaded = []
+    for typecode, cellCosts, offset, size in tables:
+        table = view[offset:offset + size].cast(typecode)
+        distances = MazeDistances(walls, cellCosts, table)
+        key = (str(walls), tuple(sorted(cellCosts.items())))
+        MAZE_DISTANCES_CACHE[key] = distances
+        loaded.append(distances)
+    return loaded
+
+def internLayout(layoutText):
+    """
+    Returns the Layout of layoutText (a list of rows), parsing each distinct
+    text only once.  The Layout is shared by every caller, and its walls, food
+    and capsules with any other layout that has the same ones, so none of them
+    may be modified: the grids are frozen, and GameStateData.initialize copies
+    the food and capsules before the game changes them.
+    """
+    key = tuple(layoutText)
+    layout = LAYOUT_CACHE.get(key)
+    if layout is None:
+        layout = Layout(list(layoutText))
+        layout.walls = internGrid(layout.walls)
+        layout.food = internGrid(layout.food)
+        layout.capsules = BOARD_CACHE.setdefault(('capsules', tuple(layout.capsules)), layout.capsules)
+        LAYOUT_CACHE[key] = layout
+    return layout
+
+def internGrid(grid):
+    "Returns the shared, frozen Grid with the contents of grid"
+    key = ('grid', grid.width, grid.height, tuple(map(tuple, grid.data)))
+    if key not in BOARD_CACHE:
+        BOARD_CACHE[key] = grid.freeze()
+    return BOARD_CACHE[key]
+
 def getLayout(name, back = 2):
     if name.endswith('.lay'):
         layout = tryToLoad('layouts/' + name)
@@ -146,5 +501,30 @@ def getLayout(name, back = 2):
 def tryToLoad(fullname):
     if(not os.path.exists(fullname)): return None
     f = open(fullname)
-    try: return Layout([line.strip() for line in f])
+    try: layout = internLayout([line.strip() for line in f])
     finally: f.close()
+    distancesFile = mazeDistancesFilename(fullname)
+    if layout.mazeDistancesFile is None and os.path.exists(distancesFile):
+        layout.loadMazeDistances(distancesFile)
+    return layout
+
+if __name__ == '__main__':
+    """
+    Precomputes the maze distance sidecar files of layouts:
+
+    > python layout.py bigMaze bigSearch
+    """
+    from optparse import OptionParser
+    parser = OptionParser('USAGE: python layout.py [options] LAYOUT...')
+    parser.add_option('--capsule-costs', dest='capsuleCosts', default=','.join(map(str, MAZE_DISTANCES_CAPSULE_COSTS)),
+                      help='comma separated capsule entry costs to precompute [Default: %default]')
+    options, names = parser.parse_args()
+    capsuleCosts = [int(c) for c in options.capsuleCosts.split(',') if c]
+    for name in names:
+        fullname = name if name.endswith('.lay') else name + '.lay'
+        if not os.path.exists(fullname):
+            fullname = os.path.join('layouts', fullname)
+        layout = tryToLoad(fullname)
+        if layout == None: raise Exception("The layout " + name + " cannot be found")
+        layout.saveMazeDistances(mazeDistancesFilename(fullname), capsuleCosts)
+        print('Wrote %s' % mazeDistancesFilename(fullname))
@@ -71,14 +71,26 @@ class GameState:
     # Accessor methods: use these to access state data #
     ####################################################
 
-    # static variable keeps track of which states have had getLegalActions called
+    # static variables keep track of the successors generated since the last
+    # reset: a count, and when enabled with setExploredTracking a sample of
+    # about exploredLimit of the states involved, since hashing them is costly
     explored = set()
+    generated = 0
+    trackExplored = False
+    exploredLimit = 10000
     def getAndResetExplored():
-        tmp = GameState.explored.copy()
+        tmp = GameState.explored
         GameState.explored = set()
+        GameState.generated = 0
         return tmp
     getAndResetExplored = staticmethod(getAndResetExplored)
 
+    def setExploredTracking(enabled=True, limit=10000):
+        GameState.trackExplored = enabled
+        GameState.exploredLimit = limit
+        GameState.getAndResetExplored()
+    setExploredTracking = staticmethod(setExploredTracking)
+
     def getLegalActions( self, agentIndex=0 ):
         """
         Returns the legal actions for the agent specified.
@@ -120,8 +132,10 @@ class GameState:
         # Book keeping
         state.data._agentMoved = agentIndex
         state.data.score += state.data.scoreChange
-        GameState.explored.add(self)
-        GameState.explored.add(state)
+        GameState.generated += 1
+        if GameState.trackExplored and len(GameState.explored) < GameState.exploredLimit:
+            GameState.explored.add(self)
+            GameState.explored.add(state)
         return state
 
     def getLegalPacmanActions( self ):
@@ -174,7 +188,7 @@ class GameState:
         return self.data.capsules
 
     def getNumFood( self ):
-        return self.data.food.count()
+        return self.data.numFood
 
     def getFood(self):
         """
@@ -185,6 +199,8 @@ class GameState:
 
         currentFood = state.getFood()
         if currentFood[x][y] == True: ...
+
+        The grid is frozen, as states share it: copy it before changing it.
         """
         return self.data.food
 
@@ -227,7 +243,7 @@ class GameState:
             self.data = GameStateData()
 
     def deepCopy( self ):
-        state = GameState( self )
+        state = GameState()
         state.data = self.data.deepCopy()
         return state
 
@@ -274,6 +290,7 @@ class ClassicGameRules:
 
     def newGame( self, layout, pacmanAgent, ghostAgents, display, quiet = False, catchExceptions=False, foodEdible=True):
         agents = [pacmanAgent] + ghostAgents[:layout.getNumGhosts()]
+        GameState.getAndResetExplored()
         initState = GameState()
         initState.initialize( layout, len(ghostAgents) )
         game = Game(agents, display, self, catchExceptions=catchExceptions)
@@ -364,14 +381,13 @@ class PacmanRules:
         # Eat food
         if state.data.food[x][y]:
             state.data.scoreChange += 10
-            state.data.food = state.data.food.copy()
-            state.data.food[x][y] = False
+            # copy on write: earlier states share the food grid
+            state.data.food = state.data.food.copyWith(x, y, False)
+            state.data.numFood -= 1
             state.data._foodEaten = position
-            # TODO: cache numFood?
-            numFood = state.getNumFood()
             if ClassicGameRules.foodEdible == False :
                 state.data._lose = True
-            if numFood == 0 and not state.data._lose:
+            if state.data.numFood == 0 and not state.data._lose:
                 state.data.scoreChange += 500
                 state.data._win = True
         # Eat capsule
@@ -529,6 +545,8 @@ def readCommand( argv ):
                       help='Turns on exception handling and timeouts during games', default=False)
     parser.add_option('--timeout', dest='timeout', type='int',
                       help=default('Maximum length of time an agent can spend computing in a single game'), default=30)
+    parser.add_option('-j', '--jobs', dest='jobs', type='int',
+                      help=default('Number of processes to play quiet (-q) games in'), default=1)
 
     options, otherjunk = parser.parse_args(argv)
     if len(otherjunk) != 0:
@@ -576,6 +594,9 @@ def readCommand( argv ):
     args['record'] = options.record
     args['catchExceptions'] = options.catchExceptions
     args['timeout'] = options.timeout
+    if options.jobs > 1:
+        if not options.quietGraphics: raise Exception('Games can only be played in parallel with -q')
+        args['jobs'] = options.jobs
 
     # Special case: recorded games don't use the runGames method or args structure
     if options.gameToReplay != None:
@@ -631,7 +652,98 @@ def replayGame( layout, actions, display ):
 
     display.finish()
 
-def runGames( layout, pacman, ghosts, display, numGames, record, numTraining = 0, catchExceptions=False, timeout=30 ):
+# The game setup shared with the worker processes of runParallelGames, which
+# are forked after it is set
+PARALLEL_GAMES = {}
+
+def timeAgentMoves( agents, times ):
+    "Makes the getAction of each agent add the time it takes to times[agent index]"
+    for i, agent in enumerate(agents):
+        def timedGetAction( state, getAction=agent.getAction, i=i ):
+            start = time.time()
+            try: return getAction(state)
+            finally: times[i] += time.time() - start
+        agent.getAction = timedGetAction
+
+def runParallelGame( game ):
+    """
+    Plays one game of runParallelGames in a worker, with the random seed of
+    that game so the result does not depend on which worker plays it.
+    """
+    import textDisplay
+    index, seed = game
+    random.seed(seed)
+    rules = ClassicGameRules(PARALLEL_GAMES['timeout'])
+    game = rules.newGame( PARALLEL_GAMES['layout'], PARALLEL_GAMES['pacman'], PARALLEL_GAMES['ghosts'],
+                          textDisplay.NullGraphics(), True, PARALLEL_GAMES['catchExceptions'])
+    if not PARALLEL_GAMES['catchExceptions']:
+        # Game.run only times agents when it catches their exceptions
+        timeAgentMoves(game.agents, game.totalAgentTimes)
+    try:
+        game.run()
+    finally:
+        for agent in game.agents:
+            if 'getAction' in agent.__dict__: del agent.getAction
+    result = {'index': index, 'score': game.state.getScore(), 'win': game.state.isWin(),
+              'moves': len(game.moveHistory), 'agentTimes': game.totalAgentTimes}
+    if PARALLEL_GAMES['record']: result['actions'] = game.moveHistory
+    return result
+
+def runParallelGames( layout, pacman, ghosts, numGames, record, jobs, catchExceptions=False, timeout=30 ):
+    """
+    Plays numGames headless games on jobs processes, printing the result of
+    each game as it finishes.  Each game gets its own random seed, drawn
+    from the random module (fixed by -f), and the results are returned in
+    game order as dicts with the score, win, moves and agentTimes of a game.
+    """
+    import multiprocessing
+    PARALLEL_GAMES.update(layout=layout, pacman=pacman, ghosts=ghosts, record=record,
+                          catchExceptions=catchExceptions, timeout=timeout)
+    seeds = [random.randrange(2 ** 31) for i in range(numGames)]
+    results = []
+    pool = multiprocessing.get_context('fork').Pool(jobs)
+    try:
+        for result in pool.imap_unordered(runParallelGame, enumerate(seeds)):
+            results.append(result)
+            print('Game %d: %s, score %d, %d moves, agent time %s (%d/%d done)' % (
+                result['index'] + 1, ['Loss', 'Win'][int(result['win'])], result['score'], result['moves'],
+                ', '.join(['%.2fs' % t for t in result['agentTimes']]), len(results), numGames))
+    finally:
+        pool.terminate()
+        pool.join()
+    results.sort(key=lambda result: result['index'])
+    return results
+
+def printGameSummary( scores, wins ):
+    winRate = wins.count(True)/ float(len(wins))
+    print('Average Score:', sum(scores) / float(len(scores)))
+    print('Scores:       ', ', '.join([str(score) for score in scores]))
+    print('Win Rate:      %d/%d (%.2f)' % (wins.count(True), len(wins), winRate))
+    print('Record:       ', ', '.join([ ['Loss', 'Win'][int(w)] for w in wins]))
+
+def recordGame( layout, actions, i ):
+    import time, pickle
+    fname = ('recorded-game-%d' % (i + 1)) +  '-'.join([str(t) for t in time.localtime()[1:6]])
+    f = open(fname, 'wb')
+    components = {'layout': layout, 'actions': actions}
+    pickle.dump(components, f)
+    f.close()
+
+def runGames( layout, pacman, ghosts, display, numGames, record, numTraining = 0, catchExceptions=False, timeout=30, jobs=1 ):
+    """
+    Plays numGames games and returns them, or with jobs > 1 plays them in
+    parallel and returns their results (see runParallelGames).
+    """
+    if jobs > 1:
+        # training games have to run one after the other for the agent to learn
+        if numTraining > 0: raise Exception('Training games cannot be played in parallel')
+        results = runParallelGames(layout, pacman, ghosts, numGames, record, jobs, catchExceptions, timeout)
+        if record:
+            for i, result in enumerate(results): recordGame(layout, result['actions'], i)
+        if numGames > 0:
+            printGameSummary([result['score'] for result in results], [result['win'] for result in results])
+        return results
+
     import __main__
     __main__.__dict__['_display'] = display
 
@@ -652,22 +764,10 @@ def runGames( layout, pacman, ghosts, display, numGames, record, numTraining = 0
         game.run()
         if not beQuiet: games.append(game)
 
-        if record:
-            import time, pickle
-            fname = ('recorded-game-%d' % (i + 1)) +  '-'.join([str(t) for t in time.localtime()[1:6]])
-            f = open(fname, 'wb')
-            components = {'layout': layout, 'actions': game.moveHistory}
-            pickle.dump(components, f)
-            f.close()
+        if record: recordGame(layout, game.moveHistory, i)
 
     if (numGames-numTraining) > 0:
-        scores = [game.state.getScore() for game in games]
-        wins = [game.state.isWin() for game in games]
-        winRate = wins.count(True)/ float(len(wins))
-        print('Average Score:', sum(scores) / float(len(scores)))
-        print('Scores:       ', ', '.join([str(score) for score in scores]))
-        print('Win Rate:      %d/%d (%.2f)' % (wins.count(True), len(wins), winRate))
-        print('Record:       ', ', '.join([ ['Loss', 'Win'][int(w)] for w in wins]))
+        printGameSummary([game.state.getScore() for game in games], [game.state.isWin() for game in games])
 
     return games
 
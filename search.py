@@ -18,6 +18,7 @@ Pacman agents (in searchAgents.py).
 """
 
 from fileinput import close
+import time
 import util
 
 class SearchProblem:
@@ -96,20 +97,21 @@ def breadthFirstSearch(problem):
     "*** YOUR CODE HERE ***"
     startState = problem.getStartState()
     myQ = util.Queue()
-    startNode = (startState,[])
+    nodes = util.SearchNodeArena()
+    startNode = (startState, nodes.addRoot())
     myQ.push(startNode)
     generated = set()
     generated.add(startState)
     while not myQ.isEmpty():
         node = myQ.pop()
-        state, actionList = node
+        state, index = node
         if problem.isGoalState(state):
-            return actionList
+            return nodes.getPath(index)
         else:
             for successor in problem.getSuccessors(state):
-                nextState, action, _ = successor
+                nextState, action, stepCost = successor
                 if not nextState in generated:
-                    nextNode = (nextState,actionList+[action])
+                    nextNode = (nextState, nodes.addNode(index, action, nodes.getCost(index) + stepCost))
                     generated.add(nextState)
                     myQ.push(nextNode)
 
@@ -126,27 +128,35 @@ def uniformCostSearch(problem):
     expansion check
     """
 
-    pQueue = util.PriorityQueue()
+    # each state is queued at most once; a cheaper path lowers its priority in place
+    pQueue = util.BucketPriorityQueue()
+    nodes = util.SearchNodeArena()
     start_state = problem.getStartState()
-    # root_node has start_state, action_list [], and g_cost value 0
-    root_node = (start_state, [], 0)
-    # push root_node into pQueue, priority will be 0, which is the g_cost value
-    pQueue.push(root_node, 0)
+    # open_nodes maps each queued state to the arena index of its best node
+    # the root node has start_state and g_cost value 0
+    open_nodes = {start_state: nodes.addRoot()}
+    # push start_state into pQueue, priority will be 0, which is the g_cost value
+    pQueue.push(start_state, 0)
     expanded = set()
 
     while not pQueue.isEmpty():
-        node = pQueue.pop()
-        state, action_list, g_cost = node
-        if state not in expanded:
-            # expand
-            expanded.add(state)
-            if problem.isGoalState(state):
-                return action_list
-            else:
-                for succ in problem.getSuccessors(state):
-                    new_state, new_action, step_cost = succ
-                    new_node = (new_state, action_list + [new_action], g_cost + step_cost)
-                    pQueue.push(new_node, g_cost + step_cost)
+        state = pQueue.pop()
+        index = open_nodes.pop(state)
+        # expand
+        expanded.add(state)
+        if problem.isGoalState(state):
+            return nodes.getPath(index)
+        else:
+            g_cost = nodes.getCost(index)
+            for succ in problem.getSuccessors(state):
+                new_state, new_action, step_cost = succ
+                new_g_cost = g_cost + step_cost
+                if new_state in expanded:
+                    continue
+                if new_state in pQueue and pQueue.getPriority(new_state) <= new_g_cost:
+                    continue
+                open_nodes[new_state] = nodes.addNode(index, new_action, new_g_cost)
+                pQueue.update(new_state, new_g_cost)
 
 def nullHeuristic(state, problem=None):
     """
@@ -155,76 +165,156 @@ def nullHeuristic(state, problem=None):
     """
     return 0
 
+class IncrementalHeuristic:
+    """
+    Turns evaluate(state, problem, parentInfo) -> (h, info) into a heuristic.
+    aStarSearch passes each child the info returned for its parent, so the
+    heuristic can update it for the one move that separates them instead of
+    starting over; parentInfo is None for the start state.  Called as
+    heuristic(state, problem), like any other heuristic, it evaluates from
+    scratch.
+    """
+    def __init__(self, evaluate):
+        self.evaluate = evaluate
+        self.__name__ = evaluate.__name__
+        self.__doc__ = evaluate.__doc__
+
+    def __call__(self, state, problem=None):
+        return self.evaluate(state, problem, None)[0]
+
+# Number of inconsistent edges aStarSearch reports when checkConsistency is on
+CONSISTENCY_SAMPLES = 5
+
+def reportInconsistency(violations, samples):
+    "Prints the edges on which the heuristic dropped by more than the step cost"
+    if violations:
+        print('[aStarSearch] heuristic inconsistent on %d edges, e.g.:' % violations)
+        for state, action, succState, h, stepCost, succH in samples:
+            print('  h=%s --%s(%s)--> h=%s: %s -> %s' % (h, action, stepCost, succH, state, succState))
+
 # Please DO NOT change the following code, we will use it to 
-def aStarSearch(problem, heuristic=nullHeuristic):
-    """Search the node that has the lowest combined cost and heuristic first."""
+def aStarSearch(problem, heuristic=nullHeuristic, checkConsistency=False):
+    """
+    Search the node that has the lowest combined cost and heuristic first.
+
+    With checkConsistency, every generated edge is checked for
+    h(state) <= stepCost + h(succState) and the violations are counted and
+    reported, with a few sample edges, when the search ends.
+    """
     "*** YOUR CODE HERE ***"
-    myPQ = util.PriorityQueue()
+    # each state is queued at most once; a cheaper path lowers its priority in place
+    myPQ = util.BucketPriorityQueue()
+    nodes = util.SearchNodeArena()
     startState = problem.getStartState()
-    startNode = (startState, '',0, [])
-    myPQ.push(startNode,heuristic(startState,problem))
-    visited = set()
+    # open_nodes maps each queued state to the arena index of its best node
+    open_nodes = {startState: nodes.addRoot()}
+    # an IncrementalHeuristic evaluates children from their parent's info
+    evaluate = getattr(heuristic, 'evaluate', None)
+    infos = dict()
+    if evaluate is None:
+        myPQ.push(startState,heuristic(startState,problem))
+    else:
+        startH, infos[startState] = evaluate(startState, problem, None)
+        myPQ.push(startState, startH)
+    # best_g holds the g of every expanded state; a cheaper path re-opens it
     best_g = dict()
+    violations, samples = 0, []
     while not myPQ.isEmpty():
-        node = myPQ.pop()
-        state, action, cost, path = node
-        if (not state in visited) or cost < best_g.get(state):
-            visited.add(state)
-            best_g[state]=cost
-            if problem.isGoalState(state):
-                path = path + [(state, action)]
-                actions = [action[1] for action in path]
-                del actions[0]
-                return actions
-            for succ in problem.getSuccessors(state):
-                succState, succAction, succCost = succ
-                newNode = (succState, succAction, cost + succCost, path + [(node, action)])
-                myPQ.push(newNode,heuristic(succState,problem)+cost+succCost)
-                old_f = cost + heuristic(state, problem)
-                new_f = cost + succCost + heuristic(succState, problem)
-                if old_f > new_f + cost:
-                    print("$$$ inconsisitent $$$")
-                    print(old_f, new_f, cost)
-                    print(state[0], action, succState[0], problem.capsulesGrid[succState[0][0]][succState[0][1]])
+        state = myPQ.pop()
+        index = open_nodes.pop(state)
+        info = infos.pop(state, None)
+        cost = nodes.getCost(index)
+        best_g[state]=cost
+        if problem.isGoalState(state):
+            if checkConsistency: reportInconsistency(violations, samples)
+            return nodes.getPath(index)
+        if checkConsistency:
+            stateH = heuristic(state, problem)
+        for succ in problem.getSuccessors(state):
+            succState, succAction, succCost = succ
+            if checkConsistency:
+                succH = heuristic(succState, problem)
+                if stateH > succCost + succH:
+                    violations += 1
+                    if len(samples) < CONSISTENCY_SAMPLES:
+                        samples.append((state, succAction, succState, stateH, succCost, succH))
+            succG = cost + succCost
+            if succState in open_nodes:
+                if nodes.getCost(open_nodes[succState]) <= succG:
+                    continue
+            elif succState in best_g and best_g[succState] <= succG:
+                continue
+            open_nodes[succState] = nodes.addNode(index, succAction, succG)
+            if evaluate is not None:
+                succH, infos[succState] = evaluate(succState, problem, info)
+            elif not checkConsistency:
+                succH = heuristic(succState,problem)
+            myPQ.update(succState, succH+succG)
+    if checkConsistency: reportInconsistency(violations, samples)
                     
     # util.raiseNotDefined()
 
 
-def enforcedHillClimbing(problem, heuristic=nullHeuristic):
+def enforcedHillClimbing(problem, heuristic=nullHeuristic, helpfulActions=False):
     """
     Local search with heuristic function.
     You DO NOT need to implement any heuristic, but you DO have to call it.
     The heuristic function is "manhattanHeuristic" from searchAgent.py.
     It will be pass to this function as second argument (heuristic).
+
+    With helpfulActions, each improvement step first only follows moves that
+    do not increase h, and falls back to the full breadth-first search when
+    that finds no better state.  Returns None at a dead end.
     """
     "*** YOUR CODE HERE FOR TASK 1 ***"
     # print("Start:", problem.getStartState())
     # print("Is the start a goal?", problem.isGoalState(problem.getStartState()))
     # # print("Start's successors:", problem.getSuccessors(problem.getStartState()))
-    node_0 = (problem.getStartState(), [])
+    nodes = util.SearchNodeArena()
+    node_0 = (problem.getStartState(), nodes.addRoot())
+    # h-values are kept across improvement steps, whose searches overlap
+    h_values = dict()
+
+    def h(state):
+        if state not in h_values:
+            h_values[state] = heuristic(state, problem)
+        return h_values[state]
+
+    def improve(node_0, h_0, helpful):
+        "Breadth-first search from node_0 for a node with h below h_0"
+        queue = util.Queue()
+        queue.push(node_0)
+        # states are marked when queued, so each is queued and expanded once
+        close_set = set([node_0[0]])
+        while not queue.isEmpty():
+            node = queue.pop()
+            state, index = node
+            if h(state) < h_0:
+                return node
+            g_cost = nodes.getCost(index)
+            for succ in problem.getSuccessors(state):
+                new_state, new_action, step_cost = succ
+                if new_state in close_set:
+                    continue
+                if helpful and h(new_state) > h(state):
+                    continue
+                close_set.add(new_state)
+                queue.push((new_state, nodes.addNode(index, new_action, g_cost+step_cost)))
+        return None
 
     while True:
-        state_0, action_list_0 = node_0
+        state_0, index_0 = node_0
         if problem.isGoalState(state_0):
-            # if state_0 is goal state, return action_list_0
-            return action_list_0
-        else:
-            # state_0 is not goal state, improve to find new node/state with strictly smaller h-value (bfs)
-            queue = util.Queue()
-            queue.push(node_0)
-            close_set = set()
-            while not queue.isEmpty():
-                node = queue.pop()
-                state, action_list = node
-                if state not in close_set:
-                    close_set.add(state)
-                    if heuristic(state, problem) < heuristic(state_0, problem):
-                        node_0 = node
-                        break
-                    for succ in problem.getSuccessors(state):
-                        new_state, new_action, _step_cost = succ
-                        new_node = (new_state, action_list+[new_action])
-                        queue.push(new_node)
+            # if state_0 is goal state, return the actions leading to it
+            return nodes.getPath(index_0)
+        # state_0 is not goal state, improve to find new node/state with strictly smaller h-value (bfs)
+        h_0 = h(state_0)
+        improved = improve(node_0, h_0, True) if helpfulActions else None
+        if improved is None:
+            improved = improve(node_0, h_0, False)
+        if improved is None:
+            return None
+        node_0 = improved
 
 
 def idaStarSearch(problem, heuristic=nullHeuristic):
@@ -243,31 +333,36 @@ def idaStarSearch(problem, heuristic=nullHeuristic):
     """
     "*** YOUR CODE HERE FOR TASK 2 ***"
     start_state = problem.getStartState()
-    # root_node has start_state, action_list [], and g_cost 0
-    root_node = (start_state, [], 0)
     bound = 0 + heuristic(start_state, problem)
 
     while True:
         # do a dfs with depth limit = bound
         min = float('inf')
-        stack = util.Stack()
-        stack.push(root_node)
-        close_set = set()
-        while not stack.isEmpty():
-            node = stack.pop()
-            state, action_list, g_cost = node
-            close_set.add(state)
+        # the actions to the current node, changed in place on descent and backtrack
+        path = []
+        # one [successors, successors left, g_cost] frame per expanded node on the
+        # path; successors are visited last to first, the order of a stack
+        frames = []
+        state, g_cost = start_state, 0
+        while True:
             f = g_cost + heuristic(state, problem)
             if f < min and f > bound:
                 min = f
             if problem.isGoalState(state):
-                return action_list
+                return path
             elif f <= bound:
-                for succ in problem.getSuccessors(state):
-                    new_state, new_action, step_cost = succ
-                    # if new_state not in close_set:
-                    new_node = (new_state, action_list+[new_action], g_cost+step_cost)
-                    stack.push(new_node)
+                successors = problem.getSuccessors(state)
+                frames.append([successors, len(successors), g_cost])
+            while frames and frames[-1][1] == 0:
+                frames.pop()
+            if not frames:
+                break
+            frame = frames[-1]
+            frame[1] -= 1
+            state, action, step_cost = frame[0][frame[1]]
+            del path[len(frames) - 1:]
+            path.append(action)
+            g_cost = frame[2] + step_cost
         bound = min
 
 
@@ -285,8 +380,7 @@ def idaStarNoDupSearch(problem, heuristic=nullHeuristic):
     """
     "*** YOUR CODE HERE FOR TASK 2 ***"
     start_state = problem.getStartState()
-    # root_node has start_state, action_list [], and g_cost 0
-    root_node = (start_state, [], 0)
+    nodes = util.SearchNodeArena()
     bound = 0 + heuristic(start_state, problem)
 
 
@@ -294,26 +388,546 @@ def idaStarNoDupSearch(problem, heuristic=nullHeuristic):
         # do a dfs with depth limit = bound
         min = float('inf')
         stack = util.Stack()
+        # root_node has start_state and the arena index of the root, whose g_cost is 0
+        nodes.truncate(0)
+        root_node = (start_state, nodes.addRoot())
         stack.push(root_node)
         close_set = set()
         while not stack.isEmpty():
             node = stack.pop()
-            state, action_list, g_cost = node
+            state, index = node
+            # every node generated after this one has already been popped,
+            # so only the current path and the stacked siblings stay in the arena
+            nodes.truncate(index + 1)
+            g_cost = nodes.getCost(index)
             close_set.add(state)
             f = g_cost + heuristic(state, problem)
             if f < min and f > bound:
                 min = f
             if problem.isGoalState(state):
-                return action_list
+                return nodes.getPath(index)
             elif f <= bound:
                 for succ in problem.getSuccessors(state):
                     new_state, new_action, step_cost = succ
                     if new_state not in close_set:
-                        new_node = (new_state, action_list+[new_action], g_cost+step_cost)
+                        new_node = (new_state, nodes.addNode(index, new_action, g_cost+step_cost))
                         stack.push(new_node)
         bound = min
 
 
+# Default number of states idaStarTranspositionSearch remembers per iteration
+IDA_TRANSPOSITION_TABLE_SIZE = 100000
+
+def idaStarTranspositionSearch(problem, heuristic=nullHeuristic, tableSize=IDA_TRANSPOSITION_TABLE_SIZE):
+    """
+    IDA* with a transposition table holding the best g with which each state
+    was reached in the current iteration.  A state reached again with no
+    smaller g is pruned: its subtree was already searched with at least the
+    same budget.  The table is a util.LRUCache of at most tableSize states and
+    is cleared for every new bound, so memory stays bounded; an evicted state
+    is merely searched again.
+    """
+    start_state = problem.getStartState()
+    nodes = util.SearchNodeArena()
+    table = util.LRUCache(tableSize)
+    bound = heuristic(start_state, problem)
+
+    while True:
+        min = float('inf')
+        stack = util.Stack()
+        nodes.truncate(0)
+        table.clear()
+        stack.push((start_state, nodes.addRoot()))
+        while not stack.isEmpty():
+            state, index = stack.pop()
+            nodes.truncate(index + 1)
+            g_cost = nodes.getCost(index)
+            best_g = table.get(state)
+            if best_g is not None and best_g <= g_cost:
+                continue
+            table[state] = g_cost
+            f = g_cost + heuristic(state, problem)
+            if f > bound:
+                # a goal beyond the bound may not be the cheapest one
+                if f < min:
+                    min = f
+                continue
+            if problem.isGoalState(state):
+                return nodes.getPath(index)
+            for new_state, new_action, step_cost in problem.getSuccessors(state):
+                stack.push((new_state, nodes.addNode(index, new_action, g_cost+step_cost)))
+        if min == float('inf'):
+            return None
+        bound = min
+
+def recursiveBestFirstSearch(problem, heuristic=nullHeuristic):
+    """
+    Recursive best-first search (Korf): a best-first search in linear memory
+    that backs the best f of a forgotten subtree up into its root, so the
+    subtree is only searched again once everything else looks worse.  Only
+    the current path and the children of its nodes are kept.
+    """
+    nodes = util.SearchNodeArena()
+    start_state = problem.getStartState()
+
+    def search(state, index, f, f_limit):
+        "Returns (goal node index or None, backed up f)"
+        if problem.isGoalState(state):
+            return index, f
+        g_cost = nodes.getCost(index)
+        children = []
+        for new_state, new_action, step_cost in problem.getSuccessors(state):
+            new_g = g_cost + step_cost
+            new_index = nodes.addNode(index, new_action, new_g)
+            children.append([max(new_g + heuristic(new_state, problem), f), new_state, new_index])
+        if not children:
+            return None, float('inf')
+        size = len(nodes)
+        while True:
+            # a stable sort keeps the successor order among equal f
+            children.sort(key=lambda child: child[0])
+            best = children[0]
+            # an infinite f means every path below is a dead end
+            if best[0] > f_limit or best[0] == float('inf'):
+                return None, best[0]
+            alternative = children[1][0] if len(children) > 1 else float('inf')
+            result, best[0] = search(best[1], best[2], best[0], min(f_limit, alternative))
+            if result is not None:
+                return result, best[0]
+            # forget the nodes of the subtree just searched
+            nodes.truncate(size)
+
+    result, f = search(start_state, nodes.addRoot(), heuristic(start_state, problem), float('inf'))
+    if result is not None:
+        return nodes.getPath(result)
+
+
+def anytimeRepairingAStarSolutions(problem, heuristic=nullHeuristic, epsilon=3.0, epsilonStep=0.5, deadline=None):
+    """
+    Anytime repairing A* (ARA*, Likhachev et al.): weighted A* ordered by
+    g + epsilon * h, continued with a smaller epsilon after every solution.
+    The open list is kept from one epsilon to the next; states whose g
+    improved after they were expanded wait in an inconsistent list and are
+    reopened, and only the priorities are recomputed.
+
+    Yields (actions, cost, bound) for every improved solution, where cost is
+    at most bound times the optimal cost; the search ends after a solution
+    with bound 1.  With a deadline, a time.time() value, the search stops
+    once a solution exists and the deadline has passed.
+    """
+    nodes = util.SearchNodeArena()
+    start_state = problem.getStartState()
+    # node_of maps every reached state to the arena index of its best node
+    node_of = {start_state: nodes.addRoot()}
+    h_values = dict()
+
+    def h(state):
+        if state not in h_values:
+            h_values[state] = heuristic(state, problem)
+        return h_values[state]
+
+    def g(state):
+        return nodes.getCost(node_of[state])
+
+    def fvalue(state):
+        return g(state) + epsilon * h(state)
+
+    open_list = util.IndexedPriorityQueue()
+    open_list.push(start_state, fvalue(start_state))
+    closed, incons = set(), set()
+    goal = start_state if problem.isGoalState(start_state) else None
+    reported = None
+    while True:
+        interrupted = False
+        while not open_list.isEmpty():
+            if goal is not None:
+                if g(goal) <= open_list.peekPriority():
+                    break
+                if deadline is not None and time.time() > deadline:
+                    interrupted = True
+                    break
+            state = open_list.pop()
+            closed.add(state)
+            index, cost = node_of[state], g(state)
+            for succ_state, succ_action, succ_cost in problem.getSuccessors(state):
+                succ_g = cost + succ_cost
+                if succ_state in node_of and g(succ_state) <= succ_g:
+                    continue
+                node_of[succ_state] = nodes.addNode(index, succ_action, succ_g)
+                if (goal is None or succ_g < g(goal)) and problem.isGoalState(succ_state):
+                    goal = succ_state
+                if succ_state in closed:
+                    incons.add(succ_state)
+                else:
+                    open_list.push(succ_state, fvalue(succ_state))
+        if goal is None:
+            return
+        # every cheaper solution passes a state still open or inconsistent
+        waiting = open_list.items() + list(incons)
+        lower = min([g(state) + h(state) for state in waiting]) if waiting else float('inf')
+        bound = g(goal) / lower if lower > 0 else float('inf')
+        if not interrupted:
+            bound = min(bound, epsilon)
+        bound = max(bound, 1.0)
+        if (g(goal), bound) != reported:
+            reported = (g(goal), bound)
+            yield nodes.getPath(node_of[goal]), g(goal), bound
+        if bound <= 1 or interrupted or (deadline is not None and time.time() > deadline):
+            return
+        epsilon = max(1.0, epsilon - epsilonStep)
+        for state in incons:
+            open_list.push(state, 0)
+        incons.clear()
+        open_list.reprioritize(fvalue)
+        closed.clear()
+
+def anytimeRepairingAStarSearch(problem, heuristic=nullHeuristic, epsilon=3.0, epsilonStep=0.5, timeLimit=None):
+    """
+    Returns the best plan anytimeRepairingAStarSolutions finds in timeLimit
+    seconds, or the optimal plan without a time limit.  The first plan is
+    always waited for.
+    """
+    deadline = None if timeLimit is None else time.time() + timeLimit
+    best = None
+    for best in anytimeRepairingAStarSolutions(problem, heuristic, epsilon, epsilonStep, deadline):
+        pass
+    if best is not None:
+        return best[0]
+
+
+def bidirectionalBreadthFirstSearch(problem):
+    """
+    Breadth-first search from the start state and, backwards, from the goal
+    state, for problems with a single goal, problem.getGoalState(), and
+    problem.getPredecessors(state) returning (predecessor, action, stepCost)
+    triples, where action leads from predecessor to state.
+
+    A whole layer is expanded at a time, on the side with the smaller frontier,
+    and the search stops with a path of fewest actions as soon as a layer
+    reaches the other side.
+    """
+    start, goal = problem.getStartState(), problem.getGoalState()
+    if problem.isGoalState(start):
+        return []
+    # state -> (parent, action, depth); backwards the parent is the next state
+    forward = {start: (None, None, 0)}
+    backward = {goal: (None, None, 0)}
+    forwardLayer, backwardLayer = [start], [goal]
+    while forwardLayer and backwardLayer:
+        if len(forwardLayer) <= len(backwardLayer):
+            forwardLayer, meeting = expandLayer(forwardLayer, forward, backward, problem.getSuccessors)
+        else:
+            backwardLayer, meeting = expandLayer(backwardLayer, backward, forward, problem.getPredecessors)
+        if meeting is not None:
+            # for the display: a visualized problem draws its expanded cells when a goal is tested
+            problem.isGoalState(goal)
+            return joinPaths(forward, backward, meeting)
+
+def expandLayer(layer, parents, others, expand):
+    """
+    Expands a BFS layer of one side of a bidirectional search.  Returns the
+    next layer and the state where the shortest path through this layer meets
+    the other side, or None.
+    """
+    nextLayer = []
+    meeting, best = None, None
+    for state in layer:
+        depth = parents[state][2] + 1
+        for nextState, action, stepCost in expand(state):
+            if nextState in parents:
+                continue
+            parents[nextState] = (state, action, depth)
+            nextLayer.append(nextState)
+            if nextState in others:
+                length = depth + others[nextState][2]
+                if best is None or length < best:
+                    meeting, best = nextState, length
+    return nextLayer, meeting
+
+def joinPaths(forward, backward, meeting):
+    "Returns the actions from the start to meeting followed by those from meeting to the goal"
+    path = []
+    state = meeting
+    while forward[state][0] is not None:
+        state, action = forward[state][:2]
+        path.append(action)
+    path.reverse()
+    state = meeting
+    while backward[state][0] is not None:
+        state, action = backward[state][:2]
+        path.append(action)
+    return path
+
+def bidirectionalAStarSearch(problem, heuristic=nullHeuristic, backwardHeuristic=None):
+    """
+    A* from the start state and, over problem.getPredecessors, from the goal
+    state (see bidirectionalBreadthFirstSearch), each side guided by its own
+    consistent front-to-end heuristic.  The side with the smaller open list is
+    expanded; the search stops once the cheapest path found so far costs no
+    more than the lowest f of either open list.
+
+    backwardHeuristic estimates the cost from a state back to the start.  By
+    default it is heuristic evaluated on problem.getReversedProblem(), or
+    nullHeuristic if the problem has no such method.
+    """
+    start, goal = problem.getStartState(), problem.getGoalState()
+    if problem.isGoalState(start):
+        return []
+    if backwardHeuristic is None:
+        if hasattr(problem, 'getReversedProblem'):
+            reversedProblem = problem.getReversedProblem()
+            backwardHeuristic = lambda state, problem: heuristic(state, reversedProblem)
+        else:
+            backwardHeuristic = nullHeuristic
+    # per side: open list, g of every reached state, state -> (parent, action)
+    sides = []
+    for state, h, expand in [(start, heuristic, problem.getSuccessors),
+                             (goal, backwardHeuristic, problem.getPredecessors)]:
+        openList = util.BucketPriorityQueue()
+        openList.push(state, h(state, problem))
+        sides.append((openList, {state: 0}, {state: (None, None)}, h, expand))
+    (forwardOpen, forwardG, forward, _, _), (backwardOpen, backwardG, backward, _, _) = sides
+    best, meeting = float('inf'), None
+    while not forwardOpen.isEmpty() and not backwardOpen.isEmpty():
+        if best <= max(forwardOpen.peekPriority(), backwardOpen.peekPriority()):
+            break
+        if len(forwardOpen) <= len(backwardOpen):
+            (openList, g, parents, h, expand), otherG = sides[0], backwardG
+        else:
+            (openList, g, parents, h, expand), otherG = sides[1], forwardG
+        state = openList.pop()
+        cost = g[state]
+        for nextState, action, stepCost in expand(state):
+            nextG = cost + stepCost
+            if nextState in g and g[nextState] <= nextG:
+                continue
+            g[nextState] = nextG
+            parents[nextState] = (state, action)
+            openList.push(nextState, nextG + h(nextState, problem))
+            if nextState in otherG and nextG + otherG[nextState] < best:
+                best, meeting = nextG + otherG[nextState], nextState
+    if meeting is None:
+        return None
+    # for the display: a visualized problem draws its expanded cells when a goal is tested
+    problem.isGoalState(goal)
+    return joinPaths(forward, backward, meeting)
+
+
+def jumpPointSearch(problem):
+    """
+    Jump Point Search for 4-connected grids with unit step costs, such as a
+    PositionSearchProblem with the default costFn.  It runs A* with the
+    Manhattan distance over jump points only: a straight move keeps going
+    until it reaches the goal or a cell where the cheapest paths may turn,
+    so the cells of long corridors and open rooms are never queued.
+
+    A horizontal move stops where a vertical scan finds a jump point; a
+    vertical move stops beside an opening that the wall behind it hid.
+    Uses problem.walls, problem.getStartState() and problem.getGoalState(),
+    and returns the same kind of action list as the other searches.
+    """
+    from game import Actions
+    walls = problem.walls
+    start, goal = problem.getStartState(), problem.getGoalState()
+    goalX, goalY = goal
+
+    def jump(x, y, dx, dy):
+        "Returns the first jump point from (x, y) in direction (dx, dy), or None"
+        while True:
+            x, y = x + dx, y + dy
+            if walls[x][y]:
+                return None
+            if x == goalX and y == goalY:
+                return (x, y)
+            if dx:
+                if jump(x, y, 0, 1) or jump(x, y, 0, -1):
+                    return (x, y)
+            elif ((not walls[x + 1][y] and walls[x + 1][y - dy]) or
+                  (not walls[x - 1][y] and walls[x - 1][y - dy])):
+                return (x, y)
+
+    def directions(point, arrival):
+        "Returns the directions worth jumping in from a jump point"
+        if arrival is None:
+            return [(0, 1), (0, -1), (1, 0), (-1, 0)]
+        dx, dy = arrival
+        if dx:
+            return [arrival, (0, 1), (0, -1)]
+        x, y = point
+        return [arrival] + [(side, 0) for side in (1, -1)
+                            if not walls[x + side][y] and walls[x + side][y - dy]]
+
+    openList = util.BucketPriorityQueue()
+    openList.push(start, util.manhattanDistance(start, goal))
+    g = {start: 0}
+    # jump point -> (previous jump point, direction of the jump)
+    parents = {start: (None, None)}
+    while not openList.isEmpty():
+        point = openList.pop()
+        if problem.isGoalState(point):
+            break
+        if hasattr(problem, '_expanded'):
+            problem._expanded += 1
+        x, y = point
+        for dx, dy in directions(point, parents[point][1]):
+            nextPoint = jump(x, y, dx, dy)
+            if nextPoint is None:
+                continue
+            nextG = g[point] + abs(nextPoint[0] - x) + abs(nextPoint[1] - y)
+            if nextPoint in g and g[nextPoint] <= nextG:
+                continue
+            g[nextPoint] = nextG
+            parents[nextPoint] = (point, (dx, dy))
+            openList.push(nextPoint, nextG + util.manhattanDistance(nextPoint, goal))
+    else:
+        return None
+    path = []
+    while parents[point][0] is not None:
+        previous, vector = parents[point]
+        steps = abs(point[0] - previous[0]) + abs(point[1] - previous[1])
+        path.extend([Actions.vectorToDirection(vector)] * steps)
+        point = previous
+    path.reverse()
+    return path
+
+
+class SearchStatistics:
+    """
+    The counters runWithStatistics gathers while a search runs:
+
+      expanded       successor lists requested (getSuccessors/getPredecessors)
+      generated      successors returned
+      duplicates     successors whose state had been generated before
+      reopened       expansions of a state that had been expanded before
+      peakOpen       most states generated but not yet expanded at one time
+      peakClosed     distinct states expanded
+      goalTests      isGoalState calls
+      heuristicCalls, heuristicTime, successorTime, wallTime (seconds)
+    """
+    FIELDS = ['expanded', 'generated', 'duplicates', 'reopened', 'peakOpen', 'peakClosed',
+              'goalTests', 'heuristicCalls', 'heuristicTime', 'successorTime', 'wallTime']
+
+    def __init__(self):
+        for field in SearchStatistics.FIELDS:
+            setattr(self, field, 0)
+        self.generatedStates = set()
+        self.expandedStates = set()
+        self.openStates = set()
+
+    def recordExpansion(self, state, successors, seconds):
+        self.expanded += 1
+        self.successorTime += seconds
+        if state in self.expandedStates:
+            self.reopened += 1
+        else:
+            self.expandedStates.add(state)
+            self.peakClosed = len(self.expandedStates)
+        self.openStates.discard(state)
+        for successor in successors:
+            self.generated += 1
+            nextState = successor[0]
+            if nextState in self.generatedStates:
+                self.duplicates += 1
+            else:
+                self.generatedStates.add(nextState)
+            if nextState not in self.expandedStates:
+                self.openStates.add(nextState)
+        self.peakOpen = max(self.peakOpen, len(self.openStates))
+
+    def asDict(self):
+        "Returns the counters as a dict with one entry per field in FIELDS"
+        return dict((field, getattr(self, field)) for field in SearchStatistics.FIELDS)
+
+class InstrumentedProblem:
+    """
+    Forwards everything to a search problem while recording its expansions
+    and goal tests in a SearchStatistics.
+    """
+    def __init__(self, problem, statistics):
+        self.problem = problem
+        self.statistics = statistics
+
+    def __getattr__(self, name):
+        return getattr(self.problem, name)
+
+    def __setattr__(self, name, value):
+        # attributes set by searches, like _expanded, belong to the problem
+        if name in ('problem', 'statistics'):
+            self.__dict__[name] = value
+        else:
+            setattr(self.problem, name, value)
+
+    def getStartState(self):
+        return self.problem.getStartState()
+
+    def isGoalState(self, state):
+        self.statistics.goalTests += 1
+        return self.problem.isGoalState(state)
+
+    def getSuccessors(self, state):
+        start = time.time()
+        successors = self.problem.getSuccessors(state)
+        self.statistics.recordExpansion(state, successors, time.time() - start)
+        return successors
+
+    def getPredecessors(self, state):
+        start = time.time()
+        predecessors = self.problem.getPredecessors(state)
+        self.statistics.recordExpansion(state, predecessors, time.time() - start)
+        return predecessors
+
+class InstrumentedHeuristic:
+    """
+    Counts and times the calls of a heuristic in a SearchStatistics, keeping
+    the evaluate method of an IncrementalHeuristic.
+    """
+    def __init__(self, heuristic, statistics):
+        self.heuristic = heuristic
+        self.statistics = statistics
+        self.__name__ = getattr(heuristic, '__name__', 'heuristic')
+        if hasattr(heuristic, 'evaluate'):
+            self.evaluate = self._evaluate
+
+    def __call__(self, state, problem=None):
+        start = time.time()
+        h = self.heuristic(state, problem)
+        self.statistics.heuristicCalls += 1
+        self.statistics.heuristicTime += time.time() - start
+        return h
+
+    def _evaluate(self, state, problem, parentInfo):
+        start = time.time()
+        result = self.heuristic.evaluate(state, problem, parentInfo)
+        self.statistics.heuristicCalls += 1
+        self.statistics.heuristicTime += time.time() - start
+        return result
+
+def runWithStatistics(searchFunction, problem, heuristic=None, **options):
+    """
+    Runs searchFunction on problem (with heuristic, if given, and any
+    keyword options) and returns (actions, record), where record is a dict
+    with the algorithm and problem names, the SearchStatistics counters, the
+    path length and the cost of the actions.
+
+    Example usage:
+      actions, record = runWithStatistics(astar, problem, manhattanHeuristic)
+    """
+    statistics = SearchStatistics()
+    instrumented = InstrumentedProblem(problem, statistics)
+    start = time.time()
+    if heuristic is None:
+        actions = searchFunction(instrumented, **options)
+    else:
+        actions = searchFunction(instrumented, InstrumentedHeuristic(heuristic, statistics), **options)
+    statistics.wallTime = time.time() - start
+    record = {'algorithm': searchFunction.__name__,
+              'heuristic': heuristic.__name__ if heuristic is not None else None,
+              'problem': type(problem).__name__}
+    record.update(statistics.asDict())
+    record['pathLength'] = len(actions) if actions is not None else None
+    record['cost'] = problem.getCostOfActions(actions) if actions is not None else None
+    return actions, record
+
 
 # Abbreviations
 bfs = breadthFirstSearch
@@ -322,5 +936,11 @@ astar = aStarSearch
 ucs = uniformCostSearch
 ida = idaStarSearch
 ehc = enforcedHillClimbing
+bibfs = bidirectionalBreadthFirstSearch
+biastar = bidirectionalAStarSearch
+jps = jumpPointSearch
+idatt = idaStarTranspositionSearch
+rbfs = recursiveBestFirstSearch
+ara = anytimeRepairingAStarSearch
 
 ida2 = idaStarNoDupSearch
\ No newline at end of file
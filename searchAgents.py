@@ -38,10 +38,14 @@ from game import Directions
 from game import Agent
 from game import Actions
 from game import Grid
+from game import BitGrid
 from searchAgents_hints import cPH1, cPH2, cPH3
 import util
 import time
+import copy
+import functools
 import search
+import layout
 
 class GoWestAgent(Agent):
     "An agent that goes West until it can't."
@@ -212,6 +216,41 @@ class PositionSearchProblem(search.SearchProblem):
 
         return successors
 
+    def getGoalState(self):
+        return self.goal
+
+    def getPredecessors(self, state):
+        """
+        Returns (predecessor, action, stepCost) triples such that taking action
+        in predecessor leads to state for stepCost, for searches that run
+        backwards from the goal.
+        """
+        predecessors = []
+        cost = self.costFn(state)
+        for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
+            x,y = state
+            dx, dy = Actions.directionToVector(action)
+            prev_x, prev_y = int(x - dx), int(y - dy)
+            if not self.walls[prev_x][prev_y]:
+                predecessors.append( ( (prev_x, prev_y), action, cost) )
+
+        # Bookkeeping for display purposes
+        self._expanded += 1 # DO NOT CHANGE
+        if state not in self._visited:
+            self._visited[state] = True
+            self._visitedlist.append(state)
+
+        return predecessors
+
+    def getReversedProblem(self):
+        """
+        Returns a copy of this problem with start and goal swapped, so that
+        heuristics measuring towards problem.goal estimate the way back.
+        """
+        reversedProblem = copy.copy(self)
+        reversedProblem.startState, reversedProblem.goal = self.goal, self.startState
+        return reversedProblem
+
     def getCostOfActions(self, actions):
         """
         Returns the cost of a particular sequence of actions. If those actions
@@ -377,10 +416,10 @@ class FoodSearchProblem:
 
     A search state in this problem is a tuple ( pacmanPosition, foodGrid ) where
       pacmanPosition: a tuple (x,y) of integers specifying Pacman's position
-      foodGrid:       a Grid (see game.py) of either True or False, specifying remaining food
+      foodGrid:       a BitGrid (see game.py) of either True or False, specifying remaining food
     """
     def __init__(self, startingGameState):
-        self.start = (startingGameState.getPacmanPosition(), startingGameState.getFood())
+        self.start = (startingGameState.getPacmanPosition(), BitGrid.fromGrid(startingGameState.getFood()))
         self.walls = startingGameState.getWalls()
         self.startingGameState = startingGameState
         self._expanded = 0 # DO NOT CHANGE
@@ -401,8 +440,7 @@ class FoodSearchProblem:
             dx, dy = Actions.directionToVector(direction)
             next_x, next_y = int(x + dx), int(y + dy)
             if not self.walls[next_x][next_y]:
-                nextFood = state[1].copy()
-                nextFood[next_x][next_y] = False
+                nextFood = state[1].without(next_x, next_y)
                 successors.append( ( ((next_x, next_y), nextFood), direction, 1) )
         return successors
 
@@ -426,7 +464,28 @@ class AStarFoodSearchAgent(SearchAgent):
         self.searchFunction = lambda prob: search.aStarSearch(prob, foodHeuristic)
         self.searchType = FoodSearchProblem
 
-def foodHeuristic(state, problem):
+class AnytimeSearchAgent(SearchAgent):
+    """
+    A SearchAgent running search.anytimeRepairingAStarSearch, which keeps
+    improving its plan for budgetFraction of the move timeout of the game
+    rules (see setMoveTimeout), or until the plan is optimal.
+
+    > python pacman.py -l bigSearch -p AnytimeSearchAgent -a epsilon=5 --timeout 10
+    """
+    def __init__(self, prob='FoodSearchProblem', heuristic='foodHeuristic', epsilon='3', epsilonStep='0.5', budgetFraction='0.5'):
+        SearchAgent.__init__(self, 'anytimeRepairingAStarSearch', prob, heuristic)
+        heur = globals()[heuristic] if heuristic in globals() else getattr(search, heuristic)
+        self.timeBudget = None
+        self.budgetFraction = float(budgetFraction)
+        self.searchFunction = lambda problem: search.anytimeRepairingAStarSearch(
+            problem, heur, float(epsilon), float(epsilonStep), self.timeBudget)
+
+    def setMoveTimeout(self, timeout):
+        "Called by the game with ClassicGameRules.getMoveTimeout before registerInitialState"
+        self.timeBudget = timeout * self.budgetFraction
+
+@search.IncrementalHeuristic
+def foodHeuristic(state, problem, parentInfo=None):
     """
     Your heuristic for the FoodSearchProblem goes here.
 
@@ -453,21 +512,78 @@ def foodHeuristic(state, problem):
     value, try: problem.heuristicInfo['wallCount'] = problem.walls.count()
     Subsequent calls to this heuristic can access
     problem.heuristicInfo['wallCount']
+
+    This heuristic is a search.IncrementalHeuristic: it returns the value
+    and the info aStarSearch hands back as parentInfo for the children.
     """
     position, foodGrid = state
     "*** YOUR CODE HERE ***"
     # return 0
-    x, y = position
-    food_list = foodGrid.asList()
-    h = 0
-    # goal aware
-    if len(food_list) == 0:
-        return h
-    for food in food_list:
-        h = max(mazeDistance(position, food, problem.startingGameState), h)
-
-    return h
-    # return 0
+    if 'mazeDistances' not in problem.heuristicInfo:
+        problem.heuristicInfo['mazeDistances'] = layout.getMazeDistances(problem.walls)
+    # dominates the distance to the farthest food
+    return foodTreeBound(position, foodGrid, problem.heuristicInfo['mazeDistances'], problem, parentInfo)
+
+def foodTreeBound(position, foodGrid, distances, problem, parentInfo=None):
+    """
+    Returns the distance from position to the nearest food plus the weight of
+    a minimum spanning tree over the remaining food, measured with the
+    MazeDistances table distances.  Any path eating all the food first reaches
+    some food and then spans the rest, so this is admissible, and it changes
+    by at most the step cost per move, so it is consistent.
+
+    Many states share the same food with Pacman elsewhere, so tree weights are
+    cached by food grid in problem.heuristicInfo.
+
+    Returns the bound and a (foodGrid, foods, weight) info.  Given the info
+    of the parent state, the food list and tree weight are reused when no
+    food was eaten and the list is updated for the one eaten food otherwise.
+    """
+    if parentInfo is not None and parentInfo[0] == foodGrid:
+        foods, weight = parentInfo[1], parentInfo[2]
+    else:
+        if parentInfo is not None:
+            # the only food a move can eat is the one Pacman moved onto
+            foods = [food for food in parentInfo[1] if food != position]
+        else:
+            foods = foodGrid.asList()
+        key = ('foodTreeWeights', id(distances))
+        if key not in problem.heuristicInfo:
+            problem.heuristicInfo[key] = util.LRUCache(HEURISTIC_CACHE_SIZE)
+        weights = problem.heuristicInfo[key]
+        weight = weights.get(foodGrid)
+        if weight is None:
+            weight = spanningTreeWeight(foods, distances) if foods else 0
+            weights[foodGrid] = weight
+    if not foods:
+        return 0, (foodGrid, foods, weight)
+    distance = distances.distance
+    return min(distance(position, food) for food in foods) + weight, (foodGrid, foods, weight)
+
+def spanningTreeWeight(points, distances):
+    """
+    Returns the weight of a minimum spanning tree over points (Prim's
+    algorithm on the complete graph).  With capsule costs a maze distance
+    depends on its direction, so each edge weighs the cheaper direction.
+    """
+    distance = distances.distance
+    symmetric = distances.unitCosts
+    remaining = list(points[1:])
+    best = []
+    for point in remaining:
+        d = distance(points[0], point)
+        best.append(d if symmetric else min(d, distance(point, points[0])))
+    weight = 0
+    while remaining:
+        i = min(range(len(remaining)), key=best.__getitem__)
+        weight += best[i]
+        added = remaining.pop(i)
+        best.pop(i)
+        for j, point in enumerate(remaining):
+            d = distance(added, point)
+            if not symmetric: d = min(d, distance(point, added))
+            if d < best[j]: best[j] = d
+    return weight
 
 class ClosestDotSearchAgent(SearchAgent):
     "Search for all food using a sequence of searches"
@@ -539,8 +655,9 @@ class AnyFoodSearchProblem(PositionSearchProblem):
 
 def mazeDistance(point1, point2, gameState):
     """
-    Returns the maze distance between any two points, using the search functions
-    you have already built. The gameState can be any game state -- Pacman's
+    Returns the maze distance between any two points, looked up in the
+    all-pairs table shared by every layout with the same walls (see
+    layout.getMazeDistances). The gameState can be any game state -- Pacman's
     position in that state is ignored.
 
     Example usage: mazeDistance( (2,4), (5,6), gameState)
@@ -552,10 +669,58 @@ def mazeDistance(point1, point2, gameState):
     walls = gameState.getWalls()
     assert not walls[x1][y1], 'point1 is a wall: ' + str(point1)
     assert not walls[x2][y2], 'point2 is a wall: ' + str(point2)
-    prob = PositionSearchProblem(gameState, start=point1, goal=point2, warn=False, visualize=False)
-    return len(search.bfs(prob))
+    return layout.getMazeDistances(walls).distance(point1, point2)
+
+def mazeDistanceField(sources, gameState):
+    """
+    Returns a NumPy array indexed [x][y] with the maze distance from the
+    closest of the source positions, or layout.UNREACHABLE behind walls.
+
+    Example usage: mazeDistanceField(gameState.getFood().asList(), gameState)
+    """
+    return layout.distanceField(gameState.getWalls(), sources)
 
 
+# Default number of heuristic values a cachedHeuristic keeps per problem
+HEURISTIC_CACHE_SIZE = 200000
+
+def stateFingerprint(state):
+    """
+    Returns a compact hashable key for a search state: BitGrids inside a
+    tuple state are replaced by their int bits, ints are kept as they are.
+    """
+    if isinstance(state, tuple):
+        return tuple(item.bits if isinstance(item, BitGrid) else item for item in state)
+    return state
+
+def cachedHeuristic(maxSize=HEURISTIC_CACHE_SIZE, fingerprint=stateFingerprint):
+    """
+    Decorates a heuristic(state, problem) so that its values are kept in a
+    util.LRUCache of at most maxSize entries per problem, keyed on
+    fingerprint(state).  getHeuristicCache returns that cache, e.g. to read
+    its hit and miss counters.
+    """
+    def decorator(heuristic):
+        @functools.wraps(heuristic)
+        def wrapper(state, problem):
+            cache = getHeuristicCache(wrapper, problem)
+            key = fingerprint(state)
+            h = cache.get(key)
+            if h is None:
+                h = heuristic(state, problem)
+                cache[key] = h
+            return h
+        wrapper.maxSize = maxSize
+        return wrapper
+    return decorator
+
+def getHeuristicCache(heuristic, problem):
+    "Returns the LRUCache a cachedHeuristic uses for problem"
+    key = ('heuristicCache', heuristic.__name__)
+    if key not in problem.heuristicInfo:
+        problem.heuristicInfo[key] = util.LRUCache(heuristic.maxSize)
+    return problem.heuristicInfo[key]
+
 class CapsuleSearchAgent(SearchAgent):
     "A SearchAgent for FoodSearchProblem using A* and your foodHeuristic"
     pass
@@ -593,7 +758,7 @@ class CapsuleSearchProblem:
     def getStartState(self):
         # You MUST implement this function to return the initial state
         "*** YOUR CODE HERE for Task 3 ***"
-        return (self.init_pos, self.foodGrid.deepCopy(), self.capsulesGrid.deepCopy())
+        return (self.init_pos, BitGrid.fromGrid(self.foodGrid), BitGrid.fromGrid(self.capsulesGrid))
 
     def isGoalState(self, state):
         # You MUST implement this function to return True or False
@@ -622,13 +787,11 @@ class CapsuleSearchProblem:
 
             if not self.walls[next_x][next_y]:
                 new_pacman_pos = (next_x, next_y)
-                new_food_grid = food_grid.deepCopy()
-                new_capsules_grid = capsules_grid.deepCopy()
-                if food_grid[next_x][next_y]:
-                    new_food_grid[next_x][next_y] = False
+                new_food_grid = food_grid.without(next_x, next_y)
+                new_capsules_grid = capsules_grid
                 cost = self.costFn(new_pacman_pos)
                 if capsules_grid[next_x][next_y]:
-                    new_capsules_grid[next_x][next_y] = False
+                    new_capsules_grid = capsules_grid.without(next_x, next_y)
                     cost = 0
                 new_state = (new_pacman_pos, new_food_grid, new_capsules_grid)
                 successors.append( ( new_state, direction, cost) )
@@ -657,6 +820,85 @@ class CapsuleSearchProblem:
             else: cost += 1
         return cost
 
+class PackedCapsuleSearchProblem(CapsuleSearchProblem):
+    """
+    A CapsuleSearchProblem whose states are single ints: the index of
+    Pacman's cell in the low posBits bits, then one bit per remaining food,
+    then one bit per remaining capsule.  Food and capsules are indexed once
+    here, so successors are a few bit operations and the closed set of a
+    search is a set of ints.
+
+    unpackState converts a state back to the (pos, foodGrid, capsulesGrid)
+    form of CapsuleSearchProblem; the actions found are the same.
+    """
+    def __init__(self, startingGameState):
+        CapsuleSearchProblem.__init__(self, startingGameState)
+        self.cells = [(x, y) for x in range(self.walls.width) for y in range(self.walls.height)
+                      if not self.walls[x][y]]
+        self.cellIndex = dict((cell, i) for i, cell in enumerate(self.cells))
+        self.posBits = max(1, (len(self.cells) - 1).bit_length())
+        self.posMask = (1 << self.posBits) - 1
+        self.foods = self.foodGrid.asList()
+        self.capsules = self.capsulesGrid.asList()
+        foodShift = self.posBits
+        capsuleShift = foodShift + len(self.foods)
+        self.foodMask = ((1 << len(self.foods)) - 1) << foodShift
+        self.foodBits = [0] * len(self.cells)
+        self.capsuleBits = [0] * len(self.cells)
+        for i, food in enumerate(self.foods):
+            self.foodBits[self.cellIndex[food]] = 1 << (foodShift + i)
+        for i, capsule in enumerate(self.capsules):
+            self.capsuleBits[self.cellIndex[capsule]] = 1 << (capsuleShift + i)
+        self.neighbors = []
+        for x, y in self.cells:
+            moves = []
+            for direction in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
+                dx, dy = Actions.directionToVector(direction)
+                next_cell = (int(x + dx), int(y + dy))
+                if next_cell in self.cellIndex:
+                    moves.append((direction, self.cellIndex[next_cell]))
+            self.neighbors.append(moves)
+
+    def packState(self, state):
+        "Returns the int encoding of a (pos, foodGrid, capsulesGrid) state"
+        pacman_pos, food_grid, capsules_grid = state
+        packed = self.cellIndex[pacman_pos]
+        for cell, bits in zip(self.cells, self.foodBits):
+            if bits and food_grid[cell[0]][cell[1]]: packed |= bits
+        for cell, bits in zip(self.cells, self.capsuleBits):
+            if bits and capsules_grid[cell[0]][cell[1]]: packed |= bits
+        return packed
+
+    def unpackState(self, state):
+        "Returns the (pos, foodGrid, capsulesGrid) form of an int state"
+        food_grid = Grid(self.walls.width, self.walls.height)
+        capsules_grid = Grid(self.walls.width, self.walls.height)
+        for (x, y), food_bits, capsule_bits in zip(self.cells, self.foodBits, self.capsuleBits):
+            if state & food_bits: food_grid[x][y] = True
+            if state & capsule_bits: capsules_grid[x][y] = True
+        return (self.cells[state & self.posMask], BitGrid.fromGrid(food_grid), BitGrid.fromGrid(capsules_grid))
+
+    def getStartState(self):
+        return self.packState((self.init_pos, self.foodGrid, self.capsulesGrid))
+
+    def isGoalState(self, state):
+        return state & self.foodMask == 0
+
+    def getSuccessors(self, state):
+        successors = []
+        self._expanded += 1 # DO NOT CHANGE
+
+        position = state & self.posMask
+        items = state ^ position
+        for direction, next_position in self.neighbors[position]:
+            next_items = items & ~self.foodBits[next_position]
+            cost = self.costFn(self.cells[next_position])
+            if next_items & self.capsuleBits[next_position]:
+                next_items ^= self.capsuleBits[next_position]
+                cost = 0
+            successors.append((next_items | next_position, direction, cost))
+        return successors
+
 # def capsuleProblemHeuristic(state, problem):
 #     # return 0
 #     if state in problem.heuristicInfo:
@@ -676,9 +918,12 @@ class CapsuleSearchProblem:
 #     return max(max_dist, food_grid.count())
 
 
-def capsuleProblemHeuristic(state, problem):
+@search.IncrementalHeuristic
+def capsuleProblemHeuristic(state, problem, parentInfo=None):
     """
     Your heuristic for the CapsuleSearchProblem goes here.
+
+    Like foodHeuristic, this is a search.IncrementalHeuristic.
     """
     "*** YOUR CODE HERE for Task 3 ***"
     # pacman_pos, food_grid, capsules_grid = state
@@ -716,12 +961,14 @@ def capsuleProblemHeuristic(state, problem):
     # h -= capsule_count
     # return h
     # return cPH2(state, problem)
-    if state in problem.heuristicInfo:
-        return problem.heuristicInfo[state]
-    else:
-        h = cPH3(state, problem)
-        problem.heuristicInfo[state] = h
-    return h
+    # foodTreeBound over maze distances in which every starting capsule is
+    # free to step on, which never overestimates a step with or without a
+    # capsule, so the bound stays consistent
+    if isinstance(state, int):
+        state = problem.unpackState(state)
+    pacman_pos, food_grid = state[0], state[1]
+    distances = capsuleMazeDistances(problem.startingGameState, encourageCapCostFn, problem)
+    return foodTreeBound(pacman_pos, food_grid, distances, problem, parentInfo)
 
 
 class CapsuleAvoidSearchAgent(SearchAgent):
@@ -769,7 +1016,7 @@ class CapsuleAvoidSearchProblem:
     def getStartState(self):
         # You MUST implement this function to return the initial state
         "*** YOUR CODE HERE for Task 4 ***"
-        return (self.init_pos, self.foodGrid.copy(), self.capsulesGrid.copy())
+        return (self.init_pos, BitGrid.fromGrid(self.foodGrid), BitGrid.fromGrid(self.capsulesGrid))
 
     def isGoalState(self, state):
         # You MUST implement this function to return True or False
@@ -796,15 +1043,13 @@ class CapsuleAvoidSearchProblem:
 
             if not self.walls[next_x][next_y]:
                 new_pacman_pos = (next_x, next_y)
-                new_food_grid = food_grid.deepCopy()
-                new_capsules_grid = capsules_grid.deepCopy()
-                if food_grid[next_x][next_y]:
-                    new_food_grid[next_x][next_y] = False
+                new_food_grid = food_grid.without(next_x, next_y)
+                new_capsules_grid = capsules_grid
                 # cost = self.costFn(new_pacman_pos, new_capsules_grid)
                 cost = self.costFn(new_pacman_pos)
 
                 if capsules_grid[next_x][next_y]:
-                    new_capsules_grid[next_x][next_y] = False
+                    new_capsules_grid = capsules_grid.without(next_x, next_y)
                     cost = 2
                 new_state = (new_pacman_pos, new_food_grid, new_capsules_grid)
                 successors.append( ( new_state, direction, cost) )
@@ -837,10 +1082,9 @@ class CapsuleAvoidSearchProblem:
         return cost
 
 
+@cachedHeuristic()
 def capsuleAvoidProblemHeuristic(state, problem):
     # return 0
-    if state in problem.heuristicInfo:
-        return problem.heuristicInfo[state]
     pacman_pos, food_grid, capsules_grid = state
     # print(state)
     startingGameState = problem.startingGameState
@@ -852,7 +1096,6 @@ def capsuleAvoidProblemHeuristic(state, problem):
         max_dist = max(food_dist, max_dist)
 
     # print(max(max_dist, food_grid.count()))
-    problem.heuristicInfo[state] = max(max_dist, food_grid.count())
     return max(max_dist, food_grid.count())
 
 
@@ -862,13 +1105,8 @@ def mazeDistance2(point1, point2, gameState, problem):
     walls = gameState.getWalls()
     assert not walls[x1][y1], 'point1 is a wall: ' + str(point1)
     assert not walls[x2][y2], 'point2 is a wall: ' + str(point2)
-    # prob = PositionSearchProblem(gameState, start=point1, goal=point2, warn=False, visualize=False)
-    # prob = AnyFoodSearchProblem(gameState)
-    prob = AvoidCapsulesPositionSearchProblem(gameState, costFn=avoidCapCostFn, start=point1, goal=point2, warn=False, visualize=False)
-    actions = uniformCostCapAvoidSearch(prob)
-    # print(actions)
-    # print(prob.getCostOfActions(actions))
-    return prob.getCostOfActions(actions)
+    # same cost as running uniformCostCapAvoidSearch on an AvoidCapsulesPositionSearchProblem
+    return capsuleMazeDistances(gameState, avoidCapCostFn, problem).distance(point1, point2)
 
 
 def mazeDistance3(point1, point2, gameState, problem):
@@ -877,14 +1115,23 @@ def mazeDistance3(point1, point2, gameState, problem):
     walls = gameState.getWalls()
     assert not walls[x1][y1], 'point1 is a wall: ' + str(point1)
     assert not walls[x2][y2], 'point2 is a wall: ' + str(point2)
-    # prob = PositionSearchProblem(gameState, start=point1, goal=point2, warn=False, visualize=False)
-    # prob = AnyFoodSearchProblem(gameState)
-    prob = AvoidCapsulesPositionSearchProblem(gameState, costFn=encourageCapCostFn, start=point1, goal=point2, warn=False, visualize=False)
-    actions = uniformCostCapAvoidSearch(prob)
-    # actions = search.bfs(prob)
-    # print(actions)
-    # print(prob.getCostOfActions(actions))
-    return prob.getCostOfActions(actions)
+    # same cost as running uniformCostCapAvoidSearch on an AvoidCapsulesPositionSearchProblem
+    return capsuleMazeDistances(gameState, encourageCapCostFn, problem).distance(point1, point2)
+
+
+def capsuleMazeDistances(gameState, costFn, problem):
+    """
+    Returns the maze distance table in which stepping onto one of the capsules
+    of gameState costs costFn(capsule, True) instead of 1.  A shortest path
+    never enters a cell twice, so this matches the capsule-eating cost of an
+    AvoidCapsulesPositionSearchProblem.  The table is kept in
+    problem.heuristicInfo.
+    """
+    key = ('capsuleMazeDistances', costFn)
+    if key not in problem.heuristicInfo:
+        cellCosts = dict((capsule, costFn(capsule, True)) for capsule in gameState.getCapsules())
+        problem.heuristicInfo[key] = layout.getMazeDistances(gameState.getWalls(), cellCosts)
+    return problem.heuristicInfo[key]
 
 
 def uniformCostCapAvoidSearch(problem):
@@ -894,30 +1141,34 @@ def uniformCostCapAvoidSearch(problem):
     """
     expansion check
     """
-    pQueue = util.PriorityQueue()
+    pQueue = util.BucketPriorityQueue()
+    nodes = util.SearchNodeArena()
     start_state = problem.getStartState()
-    init_pos, capsules_grid = start_state
-    x, y = init_pos
-    # root_node has start_state, action_list [], and g_cost value 0
-    root_node = (start_state, [], 0)
-    # push root_node into pQueue, priority will be 0, which is the g_cost value
-    pQueue.push(root_node, 0)
+    # open_nodes maps each queued state to the arena index of its best node
+    # the root node has start_state and g_cost value 0
+    open_nodes = {start_state: nodes.addRoot()}
+    # push start_state into pQueue, priority will be 0, which is the g_cost value
+    pQueue.push(start_state, 0)
     expanded = set()
 
     while not pQueue.isEmpty():
-        node = pQueue.pop()
-        state, action_list, g_cost = node
-        pacman_pos, capsules_grid = state
-        if state not in expanded:
-            # expand
-            expanded.add(state)
-            if problem.isGoalState(state):
-                return action_list
-            else:
-                for succ in problem.getSuccessors(state):
-                    new_state, new_action, step_cost = succ
-                    new_node = (new_state, action_list + [new_action], g_cost + step_cost)
-                    pQueue.push(new_node, g_cost + step_cost)
+        state = pQueue.pop()
+        index = open_nodes.pop(state)
+        # expand
+        expanded.add(state)
+        if problem.isGoalState(state):
+            return nodes.getPath(index)
+        else:
+            g_cost = nodes.getCost(index)
+            for succ in problem.getSuccessors(state):
+                new_state, new_action, step_cost = succ
+                new_g_cost = g_cost + step_cost
+                if new_state in expanded:
+                    continue
+                if new_state in pQueue and pQueue.getPriority(new_state) <= new_g_cost:
+                    continue
+                open_nodes[new_state] = nodes.addNode(index, new_action, new_g_cost)
+                pQueue.update(new_state, new_g_cost)
 
 
 # def uniformCostCapAvoidSearch(problem):
@@ -1006,7 +1257,7 @@ class AvoidCapsulesPositionSearchProblem(PositionSearchProblem):
 
     def getStartState(self):
         # a state includes the current pacman_pos and the capsulesGrid before pacman enters that pos
-        return (self.start, self.capsulesGrid)
+        return (self.start, BitGrid.fromGrid(self.capsulesGrid))
 
     def isGoalState(self, state):
         pacman_pos, capsules_grid = state
@@ -1041,10 +1292,8 @@ class AvoidCapsulesPositionSearchProblem(PositionSearchProblem):
             dx, dy = Actions.directionToVector(action)
             next_x, next_y = int(x + dx), int(y + dy)
             if not self.walls[next_x][next_y]:
-                next_capsules_grid = capsules_grid.copy()
                 eat_capsule = capsules_grid[next_x][next_y]
-                if capsules_grid[next_x][next_y]:
-                    next_capsules_grid[next_x][next_y] = False
+                next_capsules_grid = capsules_grid.without(next_x, next_y)
                 cost = self.costFn((next_x, next_y), eat_capsule)
                 nextState = ((next_x, next_y), next_capsules_grid)
                 # cost = self.costFn(nextState)
@@ -778,10 +778,15 @@ def expand(state,problem):
         dx, dy = Actions.directionToVector(direction)
         next_x, next_y = int(x + dx), int(y + dy)
         if not problem.walls[next_x][next_y]:
-            next_foods = foods.copy()
-            next_capsules = capsules.copy()
+            next_foods = foods
+            next_capsules = capsules
             if capsules[next_x][next_y]:
-                next_capsules[next_x][next_y] = False
+                if hasattr(capsules, 'without'):
+                    # BitGrid states of searchAgents
+                    next_capsules = capsules.without(next_x, next_y)
+                else:
+                    next_capsules = capsules.copy()
+                    next_capsules[next_x][next_y] = False
                 successors = successors + expand(((next_x, next_y), next_foods,next_capsules),problem)
             else:
                 
@@ -181,6 +181,8 @@ class GraphSearchTest(testClasses.TestCase):
         self.alg = testDict['algorithm']
         self.diagram = testDict['diagram']
         self.exactExpansionOrder = testDict.get('exactExpansionOrder', 'True').lower() == "true"
+        # for tests whose goal is unreachable, returning None counts as the empty solution
+        self.noSolution = testDict.get('noSolution', 'False').lower() == "true"
         if 'heuristic' in testDict:
             self.heuristic = parseHeuristic(testDict['heuristic'])
         else:
@@ -197,6 +199,9 @@ class GraphSearchTest(testClasses.TestCase):
         else:
             solution = alg(problem)
 
+        if solution is None and self.noSolution:
+            solution = []
+
         if type(solution) != type([]):
             return None, None, 'The result of %s must be a list. (Instead, it is %s)' % (self.alg, type(solution))
 
@@ -215,7 +220,7 @@ class GraphSearchTest(testClasses.TestCase):
             gold_expanded_states.append(str.split(solutionDict['alt_rev_expanded_states']))
         
         try:
-            solution, expanded_states, error =func_timeout(TIMEOUT,self.getSolInfo,args=(search))
+            solution, expanded_states, error =func_timeout(TIMEOUT,self.getSolInfo,args=(search,))
             # solution, expanded_states, error = util.TimeoutFunction(self.getSolInfo,5)(search) # Call the question's function
             #TimeoutFunction(getattr(gradingModule, q),1200)(self) # Call the question's function
         except Exception as inst:
@@ -298,7 +303,7 @@ class PacmanSearchTest(testClasses.TestCase):
 
     def getSolInfo(self, search, searchAgents):
         alg = getattr(search, self.alg)
-        lay = layout.Layout([l.strip() for l in self.layout_text.split('\n')])
+        lay = layout.internLayout([l.strip() for l in self.layout_text.split('\n')])
         start_state = pacman.GameState()
         start_state.initialize(lay, 0)
 
@@ -460,7 +465,7 @@ class CornerProblemTest(testClasses.TestCase):
         self.layoutName = testDict['layoutName']
 
     def getSolInfo(self, search, searchAgents):
-        lay = layout.Layout([l.strip() for l in self.layoutText.split('\n')])
+        lay = layout.internLayout([l.strip() for l in self.layoutText.split('\n')])
         gameState = pacman.GameState()
         gameState.initialize(lay, 0)
         problem = searchAgents.CornersProblem(gameState)
@@ -561,7 +566,7 @@ class HeuristicTest(testClasses.TestCase):
         self.heuristicName = testDict['heuristic']
 
     def setupProblem(self, searchAgents):
-        lay = layout.Layout([l.strip() for l in self.layoutText.split('\n')])
+        lay = layout.internLayout([l.strip() for l in self.layoutText.split('\n')])
         gameState = pacman.GameState()
         gameState.initialize(lay, 0)
         problemClass = getattr(searchAgents, self.searchProblemClassName)
@@ -645,7 +650,7 @@ class HeuristicGrade(testClasses.TestCase):
         self.thresholds = [int(t) for t in testDict['gradingThresholds'].split()]
 
     def setupProblem(self, searchAgents):
-        lay = layout.Layout([l.strip() for l in self.layoutText.split('\n')])
+        lay = layout.internLayout([l.strip() for l in self.layoutText.split('\n')])
         gameState = pacman.GameState()
         gameState.initialize(lay, 0)
         problemClass = getattr(searchAgents, self.searchProblemClassName)
@@ -719,7 +724,7 @@ class ClosestDotTest(testClasses.TestCase):
         self.layoutName = testDict['layoutName']
 
     def getSolInfo(self, searchAgents):
-        lay = layout.Layout([l.strip() for l in self.layoutText.split('\n')])
+        lay = layout.internLayout([l.strip() for l in self.layoutText.split('\n')])
         gameState = pacman.GameState()
         gameState.initialize(lay, 0)
         path = searchAgents.ClosestDotSearchAgent().findPathToClosestDot(gameState)
@@ -794,7 +799,7 @@ class CornerHeuristicSanity(testClasses.TestCase):
         search = moduleDict['search']
         searchAgents = moduleDict['searchAgents']
         game_state = pacman.GameState()
-        lay = layout.Layout([l.strip() for l in self.layout_text.split('\n')])
+        lay = layout.internLayout([l.strip() for l in self.layout_text.split('\n')])
         game_state.initialize(lay, 0)
         problem = searchAgents.CornersProblem(game_state)
         start_state = problem.getStartState()
@@ -849,7 +854,7 @@ class CornerHeuristicSanity(testClasses.TestCase):
         handle.write('# true cost of the optimal path from that state to a goal.\n')
 
         # solve problem and write solution
-        lay = layout.Layout([l.strip() for l in self.layout_text.split('\n')])
+        lay = layout.internLayout([l.strip() for l in self.layout_text.split('\n')])
         start_state = pacman.GameState()
         start_state.initialize(lay, 0)
         problem = searchAgents.CornersProblem(start_state)
@@ -874,7 +879,7 @@ class CornerHeuristicPacman(testClasses.TestCase):
         true_cost = float(solutionDict['cost'])
         thresholds = [int(x) for x in solutionDict['thresholds'].split()]
         game_state = pacman.GameState()
-        lay = layout.Layout([l.strip() for l in self.layout_text.split('\n')])
+        lay = layout.internLayout([l.strip() for l in self.layout_text.split('\n')])
         game_state.initialize(lay, 0)
         problem = searchAgents.CornersProblem(game_state)
         start_state = problem.getStartState()
@@ -910,7 +915,7 @@ class CornerHeuristicPacman(testClasses.TestCase):
         handle.write('# used in scoring.\n')
 
         # solve problem and write solution
-        lay = layout.Layout([l.strip() for l in self.layout_text.split('\n')])
+        lay = layout.internLayout([l.strip() for l in self.layout_text.split('\n')])
         start_state = pacman.GameState()
         start_state.initialize(lay, 0)
         problem = searchAgents.CornersProblem(start_state)
@@ -1031,7 +1036,7 @@ class CapsuleTest(testClasses.TestCase):
         return True
         
     def setupProblem(self, searchAgents):
-        lay = layout.Layout([l.strip() for l in self.layoutText.split('\n')])
+        lay = layout.internLayout([l.strip() for l in self.layoutText.split('\n')])
         gameState = pacman.GameState()
         gameState.initialize(lay, 0)
         problemClass = getattr(searchAgents, self.searchProblemClassName)
@@ -1043,11 +1048,11 @@ class CapsuleTest(testClasses.TestCase):
 
     
     def solutionCost(self,problem,solution):
-        lay = layout.Layout([l.strip() for l in self.layoutText.split('\n')])
+        lay = layout.internLayout([l.strip() for l in self.layoutText.split('\n')])
         gameState = pacman.GameState()
         gameState.initialize(lay, 0)
         startPos = gameState.getPacmanPosition()
-        foodGrid = gameState.getFood()
+        foodGrid = gameState.getFood().copy()
         walls = gameState.getWalls()
         capsulesGrid = Grid(foodGrid.width,foodGrid.height)
         for x,y in gameState.getCapsules():
@@ -1083,11 +1088,11 @@ class CapsuleTest(testClasses.TestCase):
          
     def soundnessCheck(self,problem,path):
         foodEdible = False
-        lay = layout.Layout([l.strip() for l in self.layoutText.split('\n')])
+        lay = layout.internLayout([l.strip() for l in self.layoutText.split('\n')])
         gameState = pacman.GameState()
         gameState.initialize(lay, 0)
         startPos = gameState.getPacmanPosition()
-        foodList = gameState.getFood()
+        foodList = gameState.getFood().copy()
         walls = gameState.getWalls()
         capsulePosList = gameState.getCapsules()
         x,y = startPos
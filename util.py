@@ -29,6 +29,7 @@
 import sys
 import inspect
 import heapq, random
+import collections
 
 
 class FixedRandom:
@@ -205,6 +206,201 @@ class PriorityQueue:
         else:
             self.push(item, priority)
 
+class IndexedPriorityQueue:
+    """
+      A priority queue that holds each item at most once.  A binary heap is
+      kept together with a map from item to heap position, so membership
+      tests are O(1) and update (decrease-key) is O(log n) instead of the
+      linear scan done by PriorityQueue.update.  Items must be hashable.
+
+      Items with equal priority are popped in the order they were last
+      pushed or updated, exactly like PriorityQueue.
+    """
+    def  __init__(self):
+        self.heap = []
+        self.position = {}
+        self.count = 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, item):
+        return item in self.position
+
+    def isEmpty(self):
+        return len(self.heap) == 0
+
+    def getPriority(self, item):
+        "Returns the priority of an item in the queue"
+        return self.heap[self.position[item]][0]
+
+    def push(self, item, priority):
+        "Inserts the item, or sets its priority if it is already queued"
+        entry = (priority, self.count, item)
+        self.count += 1
+        if item in self.position:
+            index = self.position[item]
+            old = self.heap[index]
+            self.heap[index] = entry
+            if entry < old:
+                self._siftUp(index)
+            else:
+                self._siftDown(index)
+        else:
+            self.heap.append(entry)
+            self.position[item] = len(self.heap) - 1
+            self._siftUp(len(self.heap) - 1)
+
+    def pop(self):
+        heap = self.heap
+        last = heap.pop()
+        if not heap:
+            del self.position[last[2]]
+            return last[2]
+        (_, _, item) = heap[0]
+        heap[0] = last
+        self.position[last[2]] = 0
+        del self.position[item]
+        self._siftDown(0)
+        return item
+
+    def peekPriority(self):
+        "Returns the lowest priority in the queue without removing its item"
+        return self.heap[0][0]
+
+    def items(self):
+        "Returns the queued items, in no particular order"
+        return list(self.position)
+
+    def reprioritize(self, priorityFunction):
+        """
+        Sets the priority of every queued item to priorityFunction(item) in
+        O(n), keeping the order of items whose priorities tie.
+        """
+        heap = [(priorityFunction(item), count, item) for (_, count, item) in self.heap]
+        heapq.heapify(heap)
+        self.heap = heap
+        self.position = dict((entry[2], index) for index, entry in enumerate(heap))
+
+    def update(self, item, priority):
+        # Same contract as PriorityQueue.update: lower the priority of a queued
+        # item, ignore equal or higher priorities, push items not yet queued.
+        index = self.position.get(item)
+        if index is None:
+            self.push(item, priority)
+        elif priority < self.heap[index][0]:
+            self.push(item, priority)
+
+    def _siftUp(self, index):
+        heap, position = self.heap, self.position
+        entry = heap[index]
+        while index > 0:
+            parent = (index - 1) >> 1
+            if heap[parent] <= entry:
+                break
+            heap[index] = heap[parent]
+            position[heap[index][2]] = index
+            index = parent
+        heap[index] = entry
+        position[entry[2]] = index
+
+    def _siftDown(self, index):
+        heap, position = self.heap, self.position
+        size = len(heap)
+        entry = heap[index]
+        while True:
+            child = 2 * index + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1] < heap[child]:
+                child += 1
+            if entry <= heap[child]:
+                break
+            heap[index] = heap[child]
+            position[heap[index][2]] = index
+            index = child
+        heap[index] = entry
+        position[entry[2]] = index
+
+class BucketPriorityQueue:
+    """
+      A bucket queue with the same interface as IndexedPriorityQueue, for the
+      small integer path costs most Pacman problems produce.  Items live in one
+      FIFO bucket per distinct priority and only the distinct priorities are
+      kept in a heap, so push and pop cost O(1) plus O(log k) for k distinct
+      priorities.  An update leaves the old bucket entry behind; stale entries
+      are skipped when popped.
+
+      Any numeric priority works, but the queue is only fast while the number
+      of distinct priorities in it stays small.
+    """
+    def  __init__(self):
+        self.buckets = {}
+        self.priorities = []
+        self.entries = {}
+        self.count = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, item):
+        return item in self.entries
+
+    def isEmpty(self):
+        return len(self.entries) == 0
+
+    def getPriority(self, item):
+        "Returns the priority of an item in the queue"
+        return self.entries[item][0]
+
+    def push(self, item, priority):
+        "Inserts the item, or sets its priority if it is already queued"
+        self.entries[item] = (priority, self.count)
+        bucket = self.buckets.get(priority)
+        if bucket is None:
+            bucket = self.buckets[priority] = collections.deque()
+            heapq.heappush(self.priorities, priority)
+        bucket.append((self.count, item))
+        self.count += 1
+
+    def peekPriority(self):
+        "Returns the lowest priority in the queue without removing its item"
+        entries = self.entries
+        while True:
+            priority = self.priorities[0]
+            bucket = self.buckets[priority]
+            while bucket:
+                count, item = bucket[0]
+                entry = entries.get(item)
+                if entry is not None and entry[1] == count:
+                    return priority
+                bucket.popleft()
+            del self.buckets[priority]
+            heapq.heappop(self.priorities)
+
+    def pop(self):
+        entries = self.entries
+        while True:
+            priority = self.priorities[0]
+            bucket = self.buckets[priority]
+            while bucket:
+                count, item = bucket.popleft()
+                entry = entries.get(item)
+                if entry is not None and entry[1] == count:
+                    del entries[item]
+                    if not bucket:
+                        del self.buckets[priority]
+                        heapq.heappop(self.priorities)
+                    return item
+            del self.buckets[priority]
+            heapq.heappop(self.priorities)
+
+    def update(self, item, priority):
+        # Same contract as PriorityQueue.update.
+        entry = self.entries.get(item)
+        if entry is None or priority < entry[0]:
+            self.push(item, priority)
+
 class PriorityQueueWithFunction(PriorityQueue):
     """
     Implements a priority queue with the same push/pop signature of the
@@ -221,6 +417,105 @@ class PriorityQueueWithFunction(PriorityQueue):
         "Adds an item to the queue with priority from the priority function"
         PriorityQueue.push(self, item, self.priorityFunction(item))
 
+class SearchNodeArena:
+    """
+    A store of search nodes kept as parallel lists of parent index, action
+    and path cost.  A node is just its int index in the arena, so generating a
+    child costs O(1) instead of copying the whole action list, and the plan is
+    only rebuilt (with getPath) once a goal node has been found.
+    """
+    ROOT_PARENT = -1
+
+    def __init__(self):
+        self.parents = []
+        self.actions = []
+        self.costs = []
+
+    def __len__(self):
+        return len(self.parents)
+
+    def addRoot(self, cost=0):
+        "Adds a node without parent and returns its index"
+        return self.addNode(SearchNodeArena.ROOT_PARENT, None, cost)
+
+    def addNode(self, parent, action, cost):
+        "Adds a child of node 'parent' reached by 'action' and returns its index"
+        self.parents.append(parent)
+        self.actions.append(action)
+        self.costs.append(cost)
+        return len(self.parents) - 1
+
+    def getCost(self, node):
+        "Returns the path cost g stored for the node"
+        return self.costs[node]
+
+    def getPath(self, node):
+        "Returns the list of actions leading from the root to the node"
+        path = []
+        parents, actions = self.parents, self.actions
+        while parents[node] != SearchNodeArena.ROOT_PARENT:
+            path.append(actions[node])
+            node = parents[node]
+        path.reverse()
+        return path
+
+    def truncate(self, size):
+        """
+        Forgets every node with index >= size.  Depth-first searches use this
+        to keep only the nodes that can still be on the current path.
+        """
+        del self.parents[size:]
+        del self.actions[size:]
+        del self.costs[size:]
+
+
+class LRUCache:
+    """
+    A dict-like cache holding at most maxSize entries.  When full, the least
+    recently read or written entry is evicted.  hits, misses and evictions
+    count the lookups made with get.
+    """
+    def __init__(self, maxSize):
+        self.maxSize = maxSize
+        self.entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key, default=None):
+        "Returns the value stored for key, marking it most recently used"
+        try:
+            value = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def __setitem__(self, key, value):
+        entries = self.entries
+        if key in entries:
+            entries.move_to_end(key)
+        elif len(entries) >= self.maxSize:
+            entries.popitem(last=False)
+            self.evictions += 1
+        entries[key] = value
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self):
+        "Returns the cache counters as a dict"
+        return {'size': len(self.entries), 'maxSize': self.maxSize, 'hits': self.hits,
+                'misses': self.misses, 'evictions': self.evictions}
+
 
 def manhattanDistance( xy1, xy2 ):
     "Returns the Manhattan distance between points xy1 and xy2"